@@ -24,18 +24,97 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+# Connections per worker process; keep pool_size + max_overflow at or above the worker's
+# thread count (see gunicorn.conf.py). SQLite's default pools take no size.
+if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+    )
+
+# Async driver URL for asgi.py (default: DATABASE_URL with its backend's async driver)
+# and the async engine's pool, shared by every request in one ASGI worker
+app.config["ASYNC_DATABASE_URL"] = os.environ.get("ASYNC_DATABASE_URL")
+app.config["ASYNC_DB_POOL_SIZE"] = int(os.environ.get("ASYNC_DB_POOL_SIZE", 20))
+app.config["ASYNC_DB_MAX_OVERFLOW"] = int(os.environ.get("ASYNC_DB_MAX_OVERFLOW", 20))
+
+# Bearer token for /api/batch-recommendations (disabled when unset), its largest cohort
+# and the most careers it returns per student
+app.config["BATCH_API_TOKEN"] = os.environ.get("BATCH_API_TOKEN")
+app.config["BATCH_MAX_STUDENTS"] = int(os.environ.get("BATCH_MAX_STUDENTS", 10000))
+app.config["BATCH_MAX_TOP_K"] = int(os.environ.get("BATCH_MAX_TOP_K", 50))
+
+# Seconds between checks for catalogue changes committed by other processes
+app.config["CATALOG_SYNC_INTERVAL"] = float(os.environ.get("CATALOG_SYNC_INTERVAL", 30))
+
+# Memoized recommendations per answer vector: entry bound and lifetime in seconds
+app.config["RECOMMENDATION_CACHE_SIZE"] = int(os.environ.get("RECOMMENDATION_CACHE_SIZE", 4096))
+app.config["RECOMMENDATION_CACHE_TTL"] = int(os.environ.get("RECOMMENDATION_CACHE_TTL", 600))
+# Memoized career detail scores and explanations per (answers, career); shares the TTL above
+app.config["EXPLANATION_CACHE_SIZE"] = int(os.environ.get("EXPLANATION_CACHE_SIZE", 4096))
+
+# Rendered template fragments kept in memory (0 disables the cache); with FRAGMENT_CACHE_DIR
+# set, fragments evicted from memory spill to local disk, up to FRAGMENT_CACHE_DISK_MB
+app.config["FRAGMENT_CACHE_SIZE"] = int(os.environ.get("FRAGMENT_CACHE_SIZE", 2048))
+app.config["FRAGMENT_CACHE_DIR"] = os.environ.get("FRAGMENT_CACHE_DIR")
+app.config["FRAGMENT_CACHE_DISK_MB"] = int(os.environ.get("FRAGMENT_CACHE_DISK_MB", 256))
+
+# Approximate career index for large catalogues: built once the catalogue reaches
+# CAREER_INDEX_MIN_SIZE careers; more probed lists trade latency for recall (0 lists = auto)
+app.config["CAREER_INDEX_ENABLED"] = os.environ.get("CAREER_INDEX_ENABLED", "false").lower() == "true"
+app.config["CAREER_INDEX_MIN_SIZE"] = int(os.environ.get("CAREER_INDEX_MIN_SIZE", 50000))
+app.config["CAREER_INDEX_LISTS"] = int(os.environ.get("CAREER_INDEX_LISTS", 0))
+app.config["CAREER_INDEX_NPROBE"] = int(os.environ.get("CAREER_INDEX_NPROBE", 32))
+
+# Precomputed per-answer score tables, rebuilt with the catalogue; about 5.4 KB per career
+app.config["PRECOMPUTED_TABLES_ENABLED"] = os.environ.get("PRECOMPUTED_TABLES_ENABLED", "false").lower() == "true"
+app.config["PRECOMPUTED_TABLES_MAX_MB"] = int(os.environ.get("PRECOMPUTED_TABLES_MAX_MB", 256))
+
+# Bearer token for /api/export; the endpoint is disabled when unset
+app.config["EXPORT_TOKEN"] = os.environ.get("EXPORT_TOKEN")
+
+# Optional write-behind queue for assessment and recommendation inserts
+app.config["WRITE_BEHIND_ENABLED"] = os.environ.get("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+app.config["WRITE_BEHIND_MAX_DEPTH"] = int(os.environ.get("WRITE_BEHIND_MAX_DEPTH", 10000))
+app.config["WRITE_BEHIND_BATCH_SIZE"] = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", 500))
+app.config["WRITE_BEHIND_FLUSH_INTERVAL"] = float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", 0.05))
+# Rows that could not be written, one JSON object per line (empty disables the file)
+app.config["WRITE_BEHIND_FAILED_FILE"] = os.environ.get(
+    "WRITE_BEHIND_FAILED_FILE", os.path.join(app.instance_path, "write-behind-failed.jsonl"))
+
+# Opt-in per-request timing: Server-Timing headers and /metrics
+app.config["INSTRUMENTATION_ENABLED"] = os.environ.get("INSTRUMENTATION_ENABLED", "false").lower() == "true"
+
+# Sampling profiler: requests sending X-Profile-Secret (or all, with PROFILE_ALL_REQUESTS)
+# are profiled; the slowest PROFILER_KEEP profiles are kept under PROFILER_DIR
+app.config["PROFILER_SECRET"] = os.environ.get("PROFILER_SECRET")
+app.config["PROFILE_ALL_REQUESTS"] = os.environ.get("PROFILE_ALL_REQUESTS", "false").lower() == "true"
+app.config["PROFILER_INTERVAL"] = float(os.environ.get("PROFILER_INTERVAL", 0.005))
+app.config["PROFILER_KEEP"] = int(os.environ.get("PROFILER_KEEP", 20))
+app.config["PROFILER_DIR"] = os.environ.get("PROFILER_DIR", os.path.join(app.instance_path, "profiles"))
 
 # Initialize the app with the extension
 db.init_app(app)
 
 # Import models and data loader after app and db initialization
 import models
+import catalog_cache
 from data_loader import load_initial_data
+from db_maintenance import migrate_schema
+from write_behind import write_queue
+from instrumentation import instrumentation
+from profiler import request_profiler
+from fragment_cache import fragment_cache
+
+write_queue.init_app(app)
+instrumentation.init_app(app)
+request_profiler.init_app(app)
+fragment_cache.init_app(app)
 
 def init_db_and_data():
     """Initialize database and load initial data"""
     with app.app_context():
-        db.create_all()
+        migrate_schema()
         load_initial_data()
 
 # Import routes
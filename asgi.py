@@ -0,0 +1,170 @@
+"""
+ASGI entry point. The chart API is served on asyncio with an async
+database driver, so a worker holds thousands of concurrent requests while
+they wait on the database; every other path goes to the Flask app.
+
+    uvicorn asgi:application --workers 4
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:application
+
+The async driver is derived from the app's database URL (aiosqlite, asyncpg or
+aiomysql must be installed) unless ASYNC_DATABASE_URL is set. Forwarding
+the Flask routes needs asgiref; without it they answer 404 and should be
+served by the WSGI workers instead (see the README).
+"""
+import asyncio
+import json
+import logging
+import re
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from app import app, db
+from catalog_cache import career_catalog
+from ml_model import CareerRecommendationEngine
+from models import Student
+from profiles import StudentProfile, ASSESSMENT_FIELDS
+from recommendation_store import stored_recommendations_statement, recommendations_from_rows
+from routes import chart_data
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # The Flask routes are optional here
+    WsgiToAsgi = None
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+_CHART_PATH = re.compile(r'/api/career-chart-data/(\d+)')
+
+_ANSWER_COLUMNS = [getattr(Student, field) for field in ASSESSMENT_FIELDS]
+
+
+def async_database_url(url):
+    """
+    The same database with the async driver of its backend
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver known for '{backend}', set ASYNC_DATABASE_URL")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncAPI:
+    """
+    Minimal ASGI application: the async chart route plus lifespan handling,
+    falling back to the Flask app for everything else
+    """
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.fallback = WsgiToAsgi(flask_app) if WsgiToAsgi is not None else None
+        self._engine = None
+
+    @property
+    def engine(self):
+        # Created on first use, inside the worker's event loop
+        if self._engine is None:
+            url = self.flask_app.config['ASYNC_DATABASE_URL']
+            if not url:
+                # The sync engine's URL, with relative SQLite paths already resolved
+                # against the instance folder the way Flask-SQLAlchemy does
+                with self.flask_app.app_context():
+                    url = async_database_url(db.engine.url)
+            options = {}
+            if make_url(url).get_backend_name() != 'sqlite':
+                options = {
+                    'pool_size': self.flask_app.config['ASYNC_DB_POOL_SIZE'],
+                    'max_overflow': self.flask_app.config['ASYNC_DB_MAX_OVERFLOW'],
+                    'pool_recycle': 300,
+                    'pool_pre_ping': True,
+                }
+            self._engine = create_async_engine(url, **options)
+        return self._engine
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http':
+            match = _CHART_PATH.fullmatch(scope['path'])
+            if match:
+                if scope['method'] not in ('GET', 'HEAD'):
+                    await self._send_json(send, 405, {'error': 'Method not allowed'})
+                    return
+                status, payload = await self.career_chart_data(int(match.group(1)))
+                await self._send_json(send, status, payload, head=scope['method'] == 'HEAD')
+                return
+        if self.fallback is None:
+            if scope['type'] == 'http':
+                await self._send_json(send, 404, {'error': 'Not found'})
+            return
+        await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._engine is not None:
+                    await self._engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _send_json(send, status, payload, head=False):
+        body = json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('ascii'))],
+        })
+        await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+    def _in_app_context(self, func, *args, **kwargs):
+        with self.flask_app.app_context():
+            return func(*args, **kwargs)
+
+    async def career_chart_data(self, student_id):
+        """
+        Same payload as the Flask route: the stored result set when there is
+        one, otherwise a fresh scoring. Queries run on the async driver;
+        the catalogue lookup and scoring are CPU work and run in a thread.
+        """
+        try:
+            async with self.engine.connect() as connection:
+                rows = (await connection.execute(stored_recommendations_statement(student_id))).all()
+                student = None
+                if not rows:
+                    student = (await connection.execute(
+                        select(*_ANSWER_COLUMNS).where(Student.id == student_id)
+                    )).first()
+
+            career_matrix = await asyncio.to_thread(self._in_app_context, career_catalog.get_matrix)
+            recommendations = recommendations_from_rows(rows, career_matrix, top_k=6)
+            if not recommendations:
+                if student is None and rows:
+                    # Stored careers all left the catalogue: rescore from the answers
+                    async with self.engine.connect() as connection:
+                        student = (await connection.execute(
+                            select(*_ANSWER_COLUMNS).where(Student.id == student_id)
+                        )).first()
+                if student is None:
+                    return 404, {'error': 'Student not found'}
+                recommendations = await asyncio.to_thread(
+                    self._in_app_context, CareerRecommendationEngine().get_career_recommendations,
+                    StudentProfile(tuple(student)), top_k=6
+                )
+            return 200, chart_data(recommendations)
+        except Exception as e:
+            logger.error(f"Error generating chart data: {str(e)}")
+            return 500, {'error': 'Failed to generate chart data'}
+
+
+application = AsyncAPI(app)
@@ -0,0 +1,363 @@
+"""
+Benchmark harness for the recommendation engine and the main routes.
+
+    python benchmark.py                        # micro + macro, JSON to stdout
+    python benchmark.py --sizes 10,1000 --output bench.json
+    python benchmark.py --skip-macro
+    python benchmark.py --load 'http://127.0.0.1:5000/api/career-chart-data/{id}' --load-ids 1000 --concurrency 1000
+
+Micro benchmarks score against synthetic career catalogues; macro
+benchmarks drive the routes through the Flask test client against a
+seeded SQLite database. Both report p50/p95/p99 latency and throughput.
+Load benchmarks hold `concurrency` keep-alive connections open against a
+running server for a fixed duration.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+from collections import namedtuple
+from datetime import datetime
+
+DEFAULT_SIZES = (10, 1_000, 100_000, 1_000_000)
+
+SyntheticCareer = namedtuple('SyntheticCareer', 'id name')
+
+
+def summarize(name, latencies, **extra):
+    """
+    Latency percentiles in milliseconds and throughput for one benchmark
+    """
+    import numpy as np
+    samples = np.asarray(latencies) * 1000.0
+    total = samples.sum() / 1000.0
+    return {
+        'name': name,
+        **extra,
+        'iterations': len(samples),
+        'p50_ms': round(float(np.percentile(samples, 50)), 4),
+        'p95_ms': round(float(np.percentile(samples, 95)), 4),
+        'p99_ms': round(float(np.percentile(samples, 99)), 4),
+        'mean_ms': round(float(samples.mean()), 4),
+        'throughput_per_s': round(len(samples) / total, 2) if total else None,
+    }
+
+
+def measure(func, iterations, warmup=3):
+    for _ in range(warmup):
+        func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def synthetic_catalog(size, rng):
+    """
+    CareerMatrix of `size` careers with weights drawn like the seeded
+    catalogue: one decimal place, about 15% of skills not required
+    """
+    import numpy as np
+    from ml_model import CareerMatrix
+    skills = np.round(rng.uniform(0.1, 1.0, (size, 5)), 1)
+    skills[rng.random((size, 5)) < 0.15] = 0.0
+    return CareerMatrix(
+        skills=skills,
+        interests=np.round(rng.uniform(0.0, 1.0, (size, 7)), 1),
+        personality=np.round(rng.uniform(0.1, 1.0, (size, 4)), 1),
+        rural=rng.random(size) < 0.5,
+        careers=[SyntheticCareer(i + 1, f'Synthetic career {i + 1}') for i in range(size)]
+    )
+
+
+def synthetic_students(count, rng):
+    from profiles import SKILL_FIELDS, INTEREST_FIELDS, PERSONALITY_FIELDS
+    fields = SKILL_FIELDS + INTEREST_FIELDS + PERSONALITY_FIELDS
+    return [dict(zip(fields, map(int, row))) for row in rng.integers(1, 6, (count, len(fields)))]
+
+
+def run_micro(sizes, seed, max_iterations):
+    """
+    Per-call latency of the scoring primitives and of a full
+    get_career_recommendations pass per catalogue size
+    """
+    import numpy as np
+    from ml_model import CareerRecommendationEngine, CAREER_SKILL_FIELDS, CAREER_INTEREST_FIELDS, \
+        CAREER_PERSONALITY_FIELDS
+    from profiles import SKILL_FIELDS, INTEREST_FIELDS, PERSONALITY_FIELDS
+    rng = np.random.default_rng(seed)
+    engine = CareerRecommendationEngine()
+    SyntheticStudent = namedtuple('SyntheticStudent', SKILL_FIELDS + INTEREST_FIELDS + PERSONALITY_FIELDS)
+    students = [SyntheticStudent(**answers) for answers in synthetic_students(64, rng)]
+    results = []
+
+    # Single-pair primitives do not depend on catalogue size
+    sample = synthetic_catalog(256, rng)
+    fields = CAREER_SKILL_FIELDS + CAREER_INTEREST_FIELDS + CAREER_PERSONALITY_FIELDS + ('rural_opportunities',)
+    FullCareer = namedtuple('FullCareer', fields)
+    careers = [
+        FullCareer(*sample.skills[i], *sample.interests[i], *sample.personality[i], bool(sample.rural[i]))
+        for i in range(len(sample))
+    ]
+    pairs = [(students[i % len(students)], careers[i % len(careers)]) for i in range(1024)]
+    pair_iter = iter(pairs * (max_iterations // len(pairs) + 2))
+
+    def match_score():
+        student, career = next(pair_iter)
+        engine.calculate_match_score(student, career)
+    results.append(summarize('calculate_match_score', measure(match_score, max_iterations)))
+
+    skill_vectors = [(rng.integers(1, 6, 5) / 5.0, sample.skills[i]) for i in range(len(sample))]
+    skill_iter = iter(skill_vectors * (max_iterations // len(skill_vectors) + 2))
+    results.append(summarize('_calculate_skills_match', measure(
+        lambda: engine._calculate_skills_match(*next(skill_iter)), max_iterations)))
+
+    personality_vectors = [(rng.integers(1, 6, 4) / 5.0, sample.personality[i]) for i in range(len(sample))]
+    personality_iter = iter(personality_vectors * (max_iterations // len(personality_vectors) + 2))
+    results.append(summarize('_calculate_personality_fit', measure(
+        lambda: engine._calculate_personality_fit(*next(personality_iter)), max_iterations)))
+
+    for size in sizes:
+        catalog = synthetic_catalog(size, rng)
+        # Keep the total work per size roughly constant
+        iterations = max(5, min(max_iterations, 2_000_000 // size))
+        student_iter = iter(students * (iterations // len(students) + 2))
+        results.append(summarize(
+            'get_career_recommendations',
+            measure(lambda: engine.get_career_recommendations(next(student_iter), top_k=8, career_matrix=catalog),
+                    iterations, warmup=1),
+            catalog_size=size
+        ))
+    return results
+
+
+def run_macro(seed, iterations, extra_careers):
+    """
+    Route latency through the Flask test client against a seeded SQLite database
+    """
+    import numpy as np
+    from sqlalchemy import insert
+    from app import app, db, init_db_and_data
+    from models import Career
+    rng = np.random.default_rng(seed)
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    init_db_and_data()
+    if extra_careers:
+        catalog = synthetic_catalog(extra_careers, rng)
+        rows = [
+            {
+                'name': career.name, 'description': 'Synthetic benchmark career', 'category': 'Benchmark',
+                **dict(zip(('technical_weight', 'communication_weight', 'analytical_weight',
+                            'creative_weight', 'leadership_weight'), map(float, catalog.skills[i]))),
+                **dict(zip(('technology_alignment', 'arts_alignment', 'business_alignment',
+                            'healthcare_alignment', 'education_alignment', 'agriculture_alignment',
+                            'government_alignment'), map(float, catalog.interests[i]))),
+                **dict(zip(('extroversion_fit', 'conscientiousness_fit', 'openness_fit',
+                            'agreeableness_fit'), map(float, catalog.personality[i]))),
+                'rural_opportunities': bool(catalog.rural[i]),
+            }
+            for i, career in enumerate(catalog.careers)
+        ]
+        with app.app_context():
+            db.session.execute(insert(Career), rows)
+            db.session.commit()
+
+    client = app.test_client()
+    students = synthetic_students(iterations + 3, rng)
+    student_iter = iter(students)
+    submitted = []
+
+    def post_assessment():
+        form = {
+            'name': 'Benchmark Student', 'age': 18, 'location': 'Village',
+            'education_level': '12th_grade', 'preferred_language': 'en',
+            **{field: str(value) for field, value in next(student_iter).items()}
+        }
+        response = client.post('/assessment', data=form)
+        assert response.status_code == 302, response.status_code
+        with client.session_transaction() as flask_session:
+            submitted.append(flask_session['student_id'])
+
+    results = [summarize('POST /assessment', measure(post_assessment, iterations))]
+
+    # First view of each submitted student scores and stores; later views read back
+    first_views = iter(submitted[3:])
+
+    def first_results_view():
+        with client.session_transaction() as flask_session:
+            flask_session['student_id'] = next(first_views)
+        assert client.get('/results').status_code == 200
+
+    results.append(summarize('GET /results (first view)', measure(first_results_view, iterations, warmup=0)))
+    results.append(summarize('GET /results (repeat view)', measure(
+        lambda: client.get('/results'), iterations)))
+
+    chart_ids = iter(submitted * 2)
+    results.append(summarize('GET /api/career-chart-data', measure(
+        lambda: client.get(f'/api/career-chart-data/{next(chart_ids)}'), iterations)))
+    for result in results:
+        result['catalog_size'] = 6 + extra_careers
+    return results
+
+
+async def _load_connection(host, port, paths, deadline, latencies, errors):
+    """
+    One keep-alive HTTP/1.1 connection issuing GETs back to back until the deadline
+    """
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            request = f"GET {random.choice(paths)} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('ascii')
+            start = time.perf_counter()
+            writer.write(request)
+            status = int((await reader.readline()).split()[1])
+            length, close = 0, False
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'connection' and value.strip().lower() == 'close':
+                    close = True
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+def run_load(url, concurrency, duration, ids):
+    """
+    Latency and throughput of a running server under `concurrency`
+    concurrent connections. `{id}` in the URL is replaced by random ids
+    from 1 to `ids`.
+    """
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    paths = [path.replace('{id}', str(i)) for i in range(1, ids + 1)] if '{id}' in path else [path]
+    latencies, errors = [], []
+
+    async def drive():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _load_connection(parts.hostname, parts.port or 80, paths, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ))
+
+    start = time.perf_counter()
+    asyncio.run(drive())
+    elapsed = time.perf_counter() - start
+    if not latencies:
+        raise RuntimeError(f"No request to {url} completed: {', '.join(sorted(map(str, set(errors))))}")
+    result = summarize(f"GET {parts.path}", latencies, concurrency=concurrency)
+    # Requests overlap, so throughput is completions over wall time, not over summed latency
+    result['throughput_per_s'] = round(len(latencies) / elapsed, 2)
+    result['errors'] = len(errors)
+    result['error_kinds'] = sorted({str(error) for error in errors})
+    return result
+
+
+def write_report(report, path=None):
+    output = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated synthetic catalogue sizes for micro benchmarks')
+    parser.add_argument('--iterations', type=int, default=2000, help='Iterations per micro benchmark')
+    parser.add_argument('--macro-iterations', type=int, default=200, help='Requests per macro benchmark')
+    parser.add_argument('--macro-careers', type=int, default=1000,
+                        help='Synthetic careers added to the seeded catalogue for macro benchmarks')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-micro', action='store_true')
+    parser.add_argument('--skip-macro', action='store_true')
+    parser.add_argument('--output', help='Write JSON here instead of stdout')
+    parser.add_argument('--load', metavar='URL',
+                        help='Load-test a running server at this URL instead of the micro and macro benchmarks')
+    parser.add_argument('--concurrency', type=int, default=100, help='Concurrent connections for --load')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per --load run')
+    parser.add_argument('--load-ids', type=int, default=1, help='Replace {id} in the --load URL with 1..N')
+    args = parser.parse_args(argv)
+
+    if args.load:
+        report = {
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat() + 'Z',
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'load': [run_load(args.load, args.concurrency, args.duration, args.load_ids)],
+        }
+        write_report(report, args.output)
+        return 0
+
+    # The app reads DATABASE_URL at import time, so point it at a scratch DB first
+    scratch_dir = tempfile.mkdtemp(prefix='career-bench-')
+    try:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch_dir, 'benchmark.db')}"
+
+        import logging
+        import numpy as np
+        logging.disable(logging.INFO)
+
+        report = {
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat() + 'Z',
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'seed': args.seed,
+            },
+            'micro': [],
+            'macro': [],
+        }
+        # Keep stdout clean for the JSON report
+        with contextlib.redirect_stdout(sys.stderr):
+            import app  # noqa: F401  Initializes models before ml_model is used
+            if not args.skip_micro:
+                sizes = [int(size) for size in args.sizes.split(',') if size]
+                report['micro'] = run_micro(sizes, args.seed, args.iterations)
+            if not args.skip_macro:
+                report['macro'] = run_macro(args.seed, args.macro_iterations, args.macro_careers)
+
+        write_report(report, args.output)
+        return 0
+    finally:
+        # The scratch database is as large as the benchmark catalogue; never leave it behind
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and an
+    optional time-to-live, with hit and miss counters. on_evict, if given,
+    is called with (key, value) for entries pushed out by the size bound.
+    """
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic, on_evict=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._on_evict = on_evict
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        evicted = []
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted_key, (evicted_value, _) = self._entries.popitem(last=False)
+                evicted.append((evicted_key, evicted_value))
+        if self._on_evict is not None:
+            # Outside the lock, the callback may be slow (e.g. disk writes)
+            for evicted_key, evicted_value in evicted:
+                self._on_evict(evicted_key, evicted_value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl
+        }
@@ -0,0 +1,230 @@
+"""
+Approximate nearest-neighbour index over the career catalogue.
+
+Careers are partitioned into inverted lists by k-means over their weight
+vectors (IVF). A query scores the list centroids with the regular scoring
+formula, takes every career in the `nprobe` best lists as candidates and
+re-ranks those exactly, so returned scores are always exact and only the
+candidate set is approximate. More probed lists mean higher recall and
+higher latency.
+
+    python career_index.py --synthetic 200000 --nprobe 4,8,16,32
+    python career_index.py                       # recall on the app's catalogue
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import numpy as np
+from app import app
+from ml_model import (CareerMatrix, top_k_indices, profile_matrix,
+                      CAREER_SKILL_FIELDS, CAREER_INTEREST_FIELDS)
+
+logger = logging.getLogger(__name__)
+
+# Scale each weight by its share of the final score so that distances in
+# feature space roughly track score differences: skills and interests are
+# averaged over 5 and 7 fields at weight 0.4, personality is a cosine at 0.2
+_SKILL_SCALE = 0.4 / len(CAREER_SKILL_FIELDS)
+_INTEREST_SCALE = 0.4 / len(CAREER_INTEREST_FIELDS)
+_PERSONALITY_SCALE = 0.2 / 2
+
+# Upper bound on distance matrix cells per assignment chunk
+_ASSIGN_CELLS = 4_000_000
+
+
+def _features(career_matrix):
+    return np.hstack([
+        career_matrix.skills * _SKILL_SCALE,
+        career_matrix.interests * _INTEREST_SCALE,
+        career_matrix.personality_unit * _PERSONALITY_SCALE,
+    ])
+
+
+def _assign(points, centroids):
+    """
+    Index of the nearest centroid for every point, in chunks
+    """
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    chunk = max(1, _ASSIGN_CELLS // len(centroids))
+    labels = np.empty(len(points), dtype=np.intp)
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk]
+        # |x - c|^2 without the per-point |x|^2 term, which does not change the argmin
+        distances = centroid_norms - 2.0 * (block @ centroids.T)
+        labels[start:start + chunk] = distances.argmin(axis=1)
+    return labels
+
+
+def kmeans(points, n_clusters, n_iter=10, sample_size=None, rng=None):
+    """
+    Lloyd's k-means. Trains on a random sample of at most sample_size
+    points, then assigns every point. Returns (centroids, labels).
+    """
+    rng = np.random.default_rng(rng)
+    if n_clusters >= len(points):
+        return points.copy(), np.arange(len(points))
+    train = points
+    if sample_size is not None and len(points) > sample_size:
+        train = points[rng.choice(len(points), sample_size, replace=False)]
+
+    centroids = train[rng.choice(len(train), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(train, centroids)
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.stack([np.bincount(labels, weights=train[:, d], minlength=n_clusters)
+                         for d in range(train.shape[1])], axis=1)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Reseed empty clusters on random training points
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = train[rng.choice(len(train), len(empty), replace=False)]
+    return centroids, _assign(points, centroids)
+
+
+class CareerIndex:
+    """
+    IVF index over a CareerMatrix. Rural and non-rural careers are clustered
+    separately so every list shares one rural boost, which keeps centroid
+    scores comparable to the scores of their members.
+    """
+    def __init__(self, career_matrix, n_lists=None, nprobe=32, n_iter=10, seed=0):
+        self.matrix = career_matrix
+        self.nprobe = nprobe
+        size = len(career_matrix)
+        if n_lists is None or n_lists <= 0:
+            n_lists = max(1, int(2 * np.sqrt(size)))
+        rng = np.random.default_rng(seed)
+        features = _features(career_matrix)
+
+        centroids, rural_flags, members = [], [], []
+        for rural in (False, True):
+            positions = np.flatnonzero(career_matrix.rural == rural)
+            if len(positions) == 0:
+                continue
+            lists = max(1, round(n_lists * len(positions) / size))
+            group_centroids, labels = kmeans(features[positions], lists, n_iter=n_iter,
+                                             sample_size=64 * lists, rng=rng)
+            order = np.argsort(labels, kind='stable')
+            bounds = np.searchsorted(labels[order], np.arange(len(group_centroids) + 1))
+            for i in range(len(group_centroids)):
+                if bounds[i] < bounds[i + 1]:
+                    centroids.append(group_centroids[i])
+                    rural_flags.append(rural)
+                    members.append(positions[order[bounds[i]:bounds[i + 1]]])
+
+        centroids = np.array(centroids).reshape(-1, features.shape[1])
+        skills_end = len(CAREER_SKILL_FIELDS)
+        interests_end = skills_end + len(CAREER_INTEREST_FIELDS)
+        # Centroids as pseudo-careers, scored with the same formula as real ones
+        self.centroids = CareerMatrix(
+            skills=centroids[:, :skills_end] / _SKILL_SCALE,
+            interests=centroids[:, skills_end:interests_end] / _INTEREST_SCALE,
+            personality=centroids[:, interests_end:] / _PERSONALITY_SCALE,
+            rural=rural_flags
+        )
+        self.members = members
+        self.sizes = np.array([len(m) for m in members])
+        logger.info(f"Built career index: {len(members)} lists over {size} careers")
+
+    def __len__(self):
+        return len(self.members)
+
+    def candidates(self, engine, profile, top_k, nprobe=None):
+        """
+        Catalogue positions in the best-scoring lists for one profile row,
+        in catalogue order. Probes further lists until there are top_k.
+        """
+        centroid_scores = engine.calculate_match_score_matrix(profile[None, :], self.centroids)[0]
+        ranked_lists = top_k_indices(centroid_scores, len(self.members))
+        probes = min(nprobe or self.nprobe, len(ranked_lists))
+        covered = np.cumsum(self.sizes[ranked_lists])
+        probes = max(probes, int(np.searchsorted(covered, min(top_k, covered[-1]))) + 1)
+        return np.sort(np.concatenate([self.members[i] for i in ranked_lists[:probes]]))
+
+    def search(self, engine, profile, top_k, nprobe=None):
+        """
+        Top careers for one profile row as (positions, exact scores), best first
+        """
+        positions = self.candidates(engine, profile, top_k, nprobe)
+        scores = engine.calculate_match_score_matrix(profile[None, :], self.matrix.take(positions))[0]
+        best = top_k_indices(scores, top_k)
+        return positions[best], scores[best]
+
+    def recall_report(self, engine, students, top_k=10, nprobes=(1, 2, 4, 8, 16, 32, 64)):
+        """
+        Mean recall@top_k against the exhaustive scorer and mean query latency,
+        per nprobe
+        """
+        profiles = profile_matrix(students)
+        exact, exact_times = [], []
+        for profile in profiles:
+            start = time.perf_counter()
+            scores = engine.calculate_match_score_matrix(profile[None, :], self.matrix)[0]
+            exact.append(set(top_k_indices(scores, top_k).tolist()))
+            exact_times.append(time.perf_counter() - start)
+
+        report = {
+            'catalog_size': len(self.matrix),
+            'lists': len(self),
+            'top_k': top_k,
+            'queries': len(profiles),
+            'exact_ms': round(float(np.mean(exact_times)) * 1000, 3),
+            'nprobe': [],
+        }
+        for nprobe in nprobes:
+            if nprobe > len(self):
+                break
+            hits, times, candidates = 0, [], 0
+            for profile, truth in zip(profiles, exact):
+                start = time.perf_counter()
+                positions, _ = self.search(engine, profile, top_k, nprobe)
+                times.append(time.perf_counter() - start)
+                hits += len(truth.intersection(positions.tolist()))
+                candidates += len(self.candidates(engine, profile, top_k, nprobe))
+            report['nprobe'].append({
+                'nprobe': nprobe,
+                'recall': round(hits / (top_k * len(profiles)), 4),
+                'mean_candidates': round(candidates / len(profiles), 1),
+                'query_ms': round(float(np.mean(times)) * 1000, 3),
+            })
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Recall/latency report for the career index')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Report on a synthetic catalogue of this size instead of the database')
+    parser.add_argument('--students', type=int, default=200, help='Random student profiles to query')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--lists', type=int, default=0, help='Inverted lists (default: 2 * sqrt(size))')
+    parser.add_argument('--nprobe', default='1,2,4,8,16,32,64', help='Comma-separated nprobe values')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    from ml_model import CareerRecommendationEngine
+    from benchmark import synthetic_catalog, synthetic_students
+    rng = np.random.default_rng(args.seed)
+    if args.synthetic:
+        career_matrix = synthetic_catalog(args.synthetic, rng)
+    else:
+        from catalog_cache import career_catalog
+        with app.app_context():
+            career_matrix = career_catalog.get_matrix()
+
+    start = time.perf_counter()
+    index = CareerIndex(career_matrix, n_lists=args.lists, seed=args.seed)
+    build_seconds = time.perf_counter() - start
+    report = index.recall_report(
+        CareerRecommendationEngine(), synthetic_students(args.students, rng), top_k=args.top_k,
+        nprobes=[int(n) for n in args.nprobe.split(',') if n]
+    )
+    report['build_seconds'] = round(build_seconds, 2)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
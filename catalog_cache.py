@@ -0,0 +1,503 @@
+import itertools
+import logging
+import re
+import threading
+import time
+from datetime import date, datetime
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import app, db
+from caching import LRUCache
+from models import Career, Course, Scholarship, CatalogRevision
+from ml_model import CareerMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersions:
+    """
+    Process-wide version counters for catalogue tables.
+    A model's counter is bumped when a committed transaction inserted,
+    updated or deleted rows of that model.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._seen = None
+        self._synced_at = float('-inf')
+
+    def watch(self, model):
+        with self._lock:
+            self._versions.setdefault(model, 0)
+
+    def is_watched(self, model):
+        return model in self._versions
+
+    def watched(self):
+        return list(self._versions)
+
+    def get(self, model):
+        return self._versions.get(model, 0)
+
+    def bump(self, *models):
+        with self._lock:
+            for model in models:
+                self._versions[model] = self._versions.get(model, 0) + 1
+        logger.debug(f"Catalogue changed: {', '.join(model.__name__ for model in models)}")
+
+    def sync(self, interval):
+        """
+        Bump models whose shared CatalogRevision moved since the last sync,
+        i.e. changes committed by other processes such as a catalogue import.
+        Reads the revision table at most once per `interval` seconds.
+        """
+        now = time.monotonic()
+        if now - self._synced_at < interval:
+            return
+        self._synced_at = now
+        try:
+            with db.engine.connect() as connection:
+                revisions = dict(connection.execute(select(CatalogRevision.name, CatalogRevision.revision)).all())
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not read catalogue revisions: {str(e)}")
+            return
+
+        first_sync = self._seen is None
+        changed = [
+            model for model in list(self._versions)
+            if not first_sync and revisions.get(model.__tablename__) != self._seen.get(model.__tablename__)
+        ]
+        self._seen = revisions
+        if changed:
+            self.bump(*changed)
+
+    def record(self, revisions):
+        """
+        Note shared revisions written by this process, already applied with
+        bump(), so that sync() only reacts to other processes' writes
+        """
+        with self._lock:
+            if self._seen is not None:
+                self._seen = {**self._seen, **revisions}
+
+
+catalog_versions = CatalogVersions()
+catalog_versions.watch(Career)
+catalog_versions.watch(Course)
+catalog_versions.watch(Scholarship)
+
+
+def _pending_changes(session):
+    return session.info.setdefault('catalog_changes', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_catalog_rows(session, flush_context):
+    """Remember which watched models were written by this flush"""
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        model = type(obj)
+        if catalog_versions.is_watched(model):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            _pending_changes(session).add(model)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_catalog_statements(orm_execute_state):
+    """Remember bulk insert/update/delete statements against watched models"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and catalog_versions.is_watched(mapper.class_):
+        _pending_changes(orm_execute_state.session).add(mapper.class_)
+
+
+def _revision_upsert(dialect):
+    """
+    INSERT ... ON CONFLICT (name) DO UPDATE revision + 1 for dialects that
+    support it, None otherwise
+    """
+    if dialect.name == 'sqlite':
+        stmt = sqlite.insert(CatalogRevision.__table__)
+    elif dialect.name == 'postgresql':
+        stmt = postgresql.insert(CatalogRevision.__table__)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'revision': CatalogRevision.__table__.c.revision + 1, 'updated_at': stmt.excluded.updated_at}
+    )
+
+
+def seed_shared_revisions():
+    """
+    Create the CatalogRevision rows of the watched models that are missing,
+    so bumps only ever update existing rows
+    """
+    existing = set(db.session.scalars(select(CatalogRevision.name)))
+    for model in catalog_versions.watched():
+        if model.__tablename__ not in existing:
+            db.session.add(CatalogRevision(name=model.__tablename__, revision=0))
+    db.session.commit()
+
+
+def bump_shared_revisions(connection, models):
+    """
+    Increment the CatalogRevision rows of models in the current transaction
+    of connection (a Session or Connection) and return the new revisions by
+    table name. Other processes reload these models on their next sync.
+    """
+    names = [model.__tablename__ for model in models]
+    dialect = connection.dialect if isinstance(connection, Connection) else connection.get_bind().dialect
+    upsert = _revision_upsert(dialect)
+    for name in names:
+        if upsert is not None:
+            # One statement, so two processes creating the row at once cannot conflict
+            connection.execute(upsert.values(name=name, revision=1, updated_at=datetime.utcnow()))
+            continue
+        # Rows seeded by migrate_schema make the INSERT a first-use fallback only
+        result = connection.execute(
+            update(CatalogRevision)
+            .where(CatalogRevision.name == name)
+            .values(revision=CatalogRevision.revision + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(CatalogRevision).values(name=name, revision=1))
+    return dict(connection.execute(
+        select(CatalogRevision.name, CatalogRevision.revision).where(CatalogRevision.name.in_(names))
+    ).all())
+
+
+@event.listens_for(Session, 'before_commit')
+def _record_catalog_revisions(session):
+    """Bump the shared revision of changed catalogue tables in the committing transaction"""
+    session.flush()
+    changes = session.info.get('catalog_changes', ())
+    if changes:
+        session.info['catalog_revisions'] = bump_shared_revisions(session, changes)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_catalog_changes(session):
+    changes = session.info.pop('catalog_changes', None)
+    revisions = session.info.pop('catalog_revisions', None)
+    if changes:
+        catalog_versions.bump(*changes)
+    if revisions:
+        catalog_versions.record(revisions)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('catalog_changes', None)
+    session.info.pop('catalog_revisions', None)
+
+
+class CareerCatalog:
+    """
+    Process-wide cache of the career table as a CareerMatrix.
+    Built on first use and rebuilt only after Career rows change, so
+    scoring requests do not query or hydrate the catalogue.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._version = None
+
+    @property
+    def version(self):
+        return catalog_versions.get(Career)
+
+    def get_matrix(self):
+        """
+        Return the cached CareerMatrix, rebuilding it if the catalogue changed
+        """
+        catalog_versions.sync(app.config['CATALOG_SYNC_INTERVAL'])
+        version = self.version
+        matrix = self._matrix
+        if matrix is not None and self._version == version:
+            return matrix
+
+        with self._lock:
+            if self._matrix is None or self._version != version:
+                self._matrix = self._load()
+                self._matrix.version = version
+                self._version = version
+                self._start_accelerators(self._matrix)
+            return self._matrix
+
+    def get_career(self, career_id):
+        """
+        Cached row of one career, or None if there is no such career
+        """
+        career_matrix = self.get_matrix()
+        position = career_matrix.index_of(career_id)
+        return None if position is None else career_matrix.careers[position]
+
+    def invalidate(self):
+        """
+        Force a rebuild, e.g. after raw SQL writes the session events cannot see
+        """
+        catalog_versions.bump(Career)
+
+    def _load(self):
+        # Plain column rows instead of ORM objects: no identity map, no
+        # session binding, safe to share between requests and threads
+        rows = db.session.execute(
+            select(*Career.__table__.columns).order_by(Career.id)
+        ).all()
+        logger.info(f"Loaded {len(rows)} careers into the scoring matrix")
+        return CareerMatrix.from_careers(rows)
+
+    def _start_accelerators(self, matrix):
+        """
+        Build the score tables and career index of a new matrix in a background
+        thread. Until each is attached, scoring falls back to the formula and
+        exact search, so a catalogue change never stalls requests on the build.
+        """
+        build_tables = False
+        if app.config['PRECOMPUTED_TABLES_ENABLED']:
+            from score_tables import ScoreTables  # Deferred import
+            table_mb = ScoreTables.table_bytes(len(matrix)) / 2 ** 20
+            build_tables = table_mb <= app.config['PRECOMPUTED_TABLES_MAX_MB']
+            if not build_tables:
+                logger.warning(f"Score tables for {len(matrix)} careers need {table_mb:.0f} MB, "
+                               f"over PRECOMPUTED_TABLES_MAX_MB; scoring with the formula")
+        build_index = app.config['CAREER_INDEX_ENABLED'] and len(matrix) >= app.config['CAREER_INDEX_MIN_SIZE']
+        if build_tables or build_index:
+            index_options = {'n_lists': app.config['CAREER_INDEX_LISTS'], 'nprobe': app.config['CAREER_INDEX_NPROBE']}
+            threading.Thread(target=self._build_accelerators, args=(matrix, build_tables, build_index, index_options),
+                             name='career-accelerators', daemon=True).start()
+
+    def _build_accelerators(self, matrix, build_tables, build_index, index_options):
+        # Readers take matrix.tables and matrix.index once per call, so each is
+        # safe to attach while requests are scoring with the matrix
+        started = time.perf_counter()
+        try:
+            if build_tables and self._matrix is matrix:
+                from score_tables import ScoreTables  # Deferred import
+                matrix.tables = ScoreTables(matrix)
+            if build_index and self._matrix is matrix:
+                from career_index import CareerIndex  # Deferred import
+                matrix.index = CareerIndex(matrix, **index_options)
+        except Exception as e:
+            logger.error(f"Could not build scoring accelerators: {str(e)}")
+            return
+        logger.info(f"Scoring accelerators for {len(matrix)} careers ready "
+                    f"in {time.perf_counter() - started:.1f}s")
+
+
+career_catalog = CareerCatalog()
+
+
+# Course.level values from easiest to hardest, for ordering
+COURSE_LEVEL_ORDER = {'Beginner': 0, 'Intermediate': 1, 'Advanced': 2}
+
+
+class CourseCatalog:
+    """
+    Process-wide career_id -> courses index, rebuilt only after Course rows
+    change, so results and career pages fetch courses without a query.
+    Courses are plain column rows in id order within each career.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_career = None
+        self._version = None
+
+    @property
+    def version(self):
+        return catalog_versions.get(Course)
+
+    def _get_index(self):
+        catalog_versions.sync(app.config['CATALOG_SYNC_INTERVAL'])
+        version = self.version
+        by_career = self._by_career
+        if by_career is not None and self._version == version:
+            return by_career
+
+        with self._lock:
+            if self._by_career is None or self._version != version:
+                self._by_career = self._load()
+                self._version = version
+            return self._by_career
+
+    def _load(self):
+        rows = db.session.execute(
+            select(*Course.__table__.columns).order_by(Course.career_id, Course.id)
+        ).all()
+        by_career = {}
+        for row in rows:
+            by_career.setdefault(row.career_id, []).append(row)
+        logger.info(f"Indexed {len(rows)} courses for {len(by_career)} careers")
+        return {career_id: tuple(courses) for career_id, courses in by_career.items()}
+
+    def for_careers(self, career_ids, level=None, is_free=None, order_by=None, limit=None):
+        """
+        Courses of the given careers, grouped in the order of career_ids.
+        level is one level or a collection of levels to keep, is_free keeps
+        free (True) or paid (False) courses, order_by is 'level' (easiest
+        first) or 'title' to sort across careers.
+        """
+        by_career = self._get_index()
+        if isinstance(level, str):
+            level = (level,)
+        courses = [
+            course
+            for career_id in dict.fromkeys(career_ids)
+            for course in by_career.get(career_id, ())
+            if (level is None or course.level in level) and (is_free is None or bool(course.is_free) == is_free)
+        ]
+        if order_by == 'level':
+            courses.sort(key=lambda course: COURSE_LEVEL_ORDER.get(course.level, len(COURSE_LEVEL_ORDER)))
+        elif order_by == 'title':
+            courses.sort(key=lambda course: course.title.lower())
+        elif order_by is not None:
+            raise ValueError(f"Unknown course ordering '{order_by}', expected level or title")
+        return courses[:limit] if limit is not None else courses
+
+    def for_career(self, career_id, **filters):
+        return self.for_careers((career_id,), **filters)
+
+
+course_catalog = CourseCatalog()
+
+
+# Eligibility wording that restricts a scholarship to some education levels
+# (the assessment form's values); scholarships mentioning none are open to all
+ELIGIBILITY_LEVELS = (
+    (re.compile(r'\b(10th|11th)\b', re.I), ('10th_grade',)),
+    (re.compile(r'\b12th\b', re.I), ('10th_grade', '12th_grade')),
+    (re.compile(r'\b(diploma|polytechnic)\b', re.I), ('diploma',)),
+    (re.compile(r'\b(undergraduate|bachelor\w*|btech|b\.tech|1st year)\b', re.I), ('12th_grade', 'graduate')),
+    (re.compile(r'\b(postgraduate|master\w*|mtech|m\.tech|phd)\b', re.I), ('graduate', 'postgraduate')),
+)
+
+_MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+           'august', 'september', 'october', 'november', 'december')
+_DEADLINE = re.compile(r'\b(' + '|'.join(_MONTHS) + r')\s+(\d{1,2})(?:st|nd|rd|th)?\b', re.I)
+
+
+def eligible_levels(scholarship):
+    """
+    Education levels a scholarship's eligibility and description mention,
+    or None if they do not restrict it
+    """
+    text = f"{scholarship.eligibility or ''} {scholarship.description or ''}"
+    levels = set()
+    for pattern, pattern_levels in ELIGIBILITY_LEVELS:
+        if pattern.search(text):
+            levels.update(pattern_levels)
+    return frozenset(levels) or None
+
+
+def deadline_dates(deadline):
+    """
+    (month, day) of every annual deadline named in the free-text deadline
+    field, e.g. "May 31st and September 30th"
+    """
+    dates = []
+    for month, day in _DEADLINE.findall(deadline or ''):
+        month = _MONTHS.index(month.lower()) + 1
+        try:
+            date(2000, month, int(day))  # Leap year, so February 29th is accepted
+        except ValueError:
+            continue
+        dates.append((month, int(day)))
+    return dates
+
+
+def days_until_deadline(dates, today):
+    """
+    Days from today to the nearest upcoming deadline, None without deadlines
+    """
+    days = []
+    for month, day in dates:
+        for year in (today.year, today.year + 1):
+            try:
+                deadline = date(year, month, day)
+            except ValueError:  # February 29th outside a leap year
+                deadline = date(year, month, 28)
+            if deadline >= today:
+                days.append((deadline - today).days)
+                break
+    return min(days) if days else None
+
+
+class ScholarshipCatalog:
+    """
+    Process-wide ranked scholarship list: rural-friendly first, then by id,
+    the order /results has always shown. Rebuilt only after Scholarship
+    rows change. Each entry carries its eligible education levels and
+    deadlines, so per-profile shortlists are filtered in memory.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+
+    @property
+    def version(self):
+        return catalog_versions.get(Scholarship)
+
+    def _get_entries(self):
+        catalog_versions.sync(app.config['CATALOG_SYNC_INTERVAL'])
+        version = self.version
+        entries = self._entries
+        if entries is not None and self._version == version:
+            return entries
+
+        with self._lock:
+            if self._entries is None or self._version != version:
+                self._entries = self._load()
+                self._version = version
+            return self._entries
+
+    def _load(self):
+        rows = db.session.execute(
+            select(*Scholarship.__table__.columns)
+            .order_by(Scholarship.for_rural_students.desc(), Scholarship.id)
+        ).all()
+        logger.info(f"Loaded {len(rows)} scholarships into the shortlist")
+        return [(row, eligible_levels(row), deadline_dates(row.deadline)) for row in rows]
+
+    def shortlist(self, limit=6, education_level=None, within_days=None, today=None):
+        """
+        Top `limit` scholarships in rank order. education_level keeps those
+        open to that level; within_days keeps those with a deadline in the
+        next within_days days.
+        """
+        if within_days is not None:
+            today = today or date.today()
+        shortlist = []
+        for row, levels, deadlines in self._get_entries():
+            if education_level is not None and levels is not None and education_level not in levels:
+                continue
+            if within_days is not None:
+                days = days_until_deadline(deadlines, today)
+                if days is None or days > within_days:
+                    continue
+            shortlist.append(row)
+            if len(shortlist) == limit:
+                break
+        return shortlist
+
+
+scholarship_catalog = ScholarshipCatalog()
+
+# Ranked careers per (student answers, catalogue version), see
+# CareerRecommendationEngine._ranked_careers_cached
+recommendation_cache = LRUCache(
+    max_size=app.config['RECOMMENDATION_CACHE_SIZE'],
+    ttl=app.config['RECOMMENDATION_CACHE_TTL']
+)
+
+# Score, sub-scores and reasons per (student answers, career, catalogue version),
+# see CareerRecommendationEngine.score_and_explain
+explanation_cache = LRUCache(
+    max_size=app.config['EXPLANATION_CACHE_SIZE'],
+    ttl=app.config['RECOMMENDATION_CACHE_TTL']
+)
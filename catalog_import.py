@@ -0,0 +1,319 @@
+"""
+Bulk import of careers, courses and scholarships from JSON, CSV or YAML.
+
+JSON and YAML files hold an object with any of the sections "careers",
+"courses" and "scholarships", each a list of records, or a bare list for
+one section. A CSV file holds one section, named by --section or by the
+file name (careers.csv, courses.csv, scholarships.csv). Courses name their
+career in a "career" field.
+
+Records are matched to existing rows by natural key (career name, course
+career and title, scholarship name). New keys are inserted, changed rows
+updated and, with prune, rows missing from the files deleted, all in one
+transaction. Nothing is written if any record is invalid.
+"""
+import csv
+import json
+import logging
+import os
+from sqlalchemy import Boolean, Column, Float, Integer, String, delete, insert, select, update
+from app import db
+
+try:
+    import yaml
+except ImportError:  # YAML catalogues are optional
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SECTIONS = ('careers', 'courses', 'scholarships')
+
+# Keys listed per change kind in the report
+REPORT_SAMPLE_SIZE = 20
+
+COURSE_LEVELS = ('Beginner', 'Intermediate', 'Advanced')
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'y')
+_FALSE_VALUES = ('0', 'false', 'no', 'n', '')
+
+
+class CatalogImportError(ValueError):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid catalogue records")
+        self.errors = errors
+
+
+def _section_model(section):
+    from models import Career, Course, Scholarship  # Deferred import
+    return {'careers': Career, 'courses': Course, 'scholarships': Scholarship}[section]
+
+
+def _natural_key(section, record):
+    if section == 'courses':
+        return (record['career'], record['title'])
+    return record['name']
+
+
+def read_catalog_file(path, section=None):
+    """
+    Records per section from one catalogue file
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        section = section or os.path.splitext(os.path.basename(path))[0].lower()
+        if section not in CATALOG_SECTIONS:
+            raise CatalogImportError([f"{path}: cannot tell the section of a CSV file, pass one of "
+                                      f"{', '.join(CATALOG_SECTIONS)}"])
+        with open(path, newline='', encoding='utf-8') as f:
+            return {section: list(csv.DictReader(f))}
+
+    if extension == '.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    elif extension in ('.yaml', '.yml'):
+        if yaml is None:
+            raise CatalogImportError([f"{path}: YAML catalogues need the PyYAML package"])
+        with open(path, encoding='utf-8') as f:
+            data = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    else:
+        raise CatalogImportError([f"{path}: unsupported file type '{extension}', expected .json, .csv or .yaml"])
+
+    if isinstance(data, list):
+        if section not in CATALOG_SECTIONS:
+            raise CatalogImportError([f"{path}: a bare list needs a section, one of {', '.join(CATALOG_SECTIONS)}"])
+        return {section: data}
+    if not isinstance(data, dict) or not set(data) <= set(CATALOG_SECTIONS):
+        raise CatalogImportError([f"{path}: expected an object with {', '.join(CATALOG_SECTIONS)}"])
+    return data
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"expected true or false, got {value!r}")
+
+
+def _converter(column, weight=False):
+    """
+    Function converting a raw file value to the column's type, None for
+    empty values; raises ValueError. Built once per column so validating
+    large files does not re-inspect the column type per value.
+    """
+    if isinstance(column.type, Boolean):
+        return _parse_bool
+    if isinstance(column.type, Float):
+        def convert(value):
+            if value is None or value == '':
+                return None
+            value = float(value)
+            if weight and not 0.0 <= value <= 1.0:
+                raise ValueError("must be between 0 and 1")
+            return value
+        return convert
+    if isinstance(column.type, Integer):
+        return lambda value: None if value is None or value == '' else int(value)
+    length = getattr(column.type, 'length', None)
+
+    def convert(value):
+        if value is None:
+            return None
+        value = str(value).strip()
+        if length and len(value) > length:
+            raise ValueError(f"longer than {length} characters")
+        return value or None
+    return convert
+
+
+def validate_section(section, records, source):
+    """
+    Coerce and check the records of one section. Returns (rows, errors),
+    rows keyed by natural key.
+    """
+    from ml_model import CAREER_SKILL_FIELDS, CAREER_INTEREST_FIELDS, CAREER_PERSONALITY_FIELDS  # Deferred import
+    model = _section_model(section)
+    weights = set(CAREER_SKILL_FIELDS + CAREER_INTEREST_FIELDS + CAREER_PERSONALITY_FIELDS)
+    columns = [column for column in model.__table__.columns
+               if not column.primary_key and column.name != 'career_id']
+    converters = {column.name: _converter(column, column.name in weights) for column in columns}
+    required = [column.name for column in columns if not column.nullable and column.default is None]
+    if section == 'courses':
+        converters['career'] = _converter(Column('career', String))
+        required.append('career')
+
+    rows, errors = {}, []
+    for number, record in enumerate(records, start=1):
+        where = f"{source} {section}[{number}]"
+        if not isinstance(record, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        unknown = [name for name in record if name not in converters]
+        if unknown:
+            errors.append(f"{where}: unknown fields {', '.join(sorted(unknown))}")
+            continue
+
+        row, valid = {}, True
+        for name, value in record.items():
+            try:
+                row[name] = converters[name](value)
+            except (TypeError, ValueError) as e:
+                errors.append(f"{where}.{name}: {e}")
+                valid = False
+        if section == 'courses' and row.get('level') not in (None,) + COURSE_LEVELS:
+            errors.append(f"{where}.level: expected one of {', '.join(COURSE_LEVELS)}")
+            valid = False
+        missing = [name for name in required if row.get(name) is None]
+        if missing:
+            errors.append(f"{where}: missing {', '.join(missing)}")
+            continue
+        if not valid:
+            continue
+
+        key = _natural_key(section, row)
+        if key in rows:
+            errors.append(f"{where}: duplicate {section} key {key!r}")
+            continue
+        rows[key] = row
+    return rows, errors
+
+
+def _existing_rows(section, model, compare):
+    """
+    Current rows keyed by natural key, with id and the compared columns.
+    With duplicate keys in the table the lowest id wins.
+    """
+    from models import Career  # Deferred import
+    columns = [model.id] + [getattr(model, name) for name in compare]
+    statement = select(*columns).order_by(model.id)
+    if section == 'courses':
+        statement = statement.add_columns(Career.name.label('career')).join(Career, Career.id == model.career_id)
+    existing = {}
+    for row in db.session.execute(statement).mappings():
+        key = _natural_key(section, row)
+        existing.setdefault(key, dict(row))
+    return existing
+
+
+def _sample(keys):
+    keys = list(keys)
+    return {'count': len(keys), 'keys': [list(key) if isinstance(key, tuple) else key
+                                         for key in keys[:REPORT_SAMPLE_SIZE]]}
+
+
+def _sync_section(section, rows, prune, chunk_size):
+    """
+    Insert new, update changed and optionally delete missing rows of one
+    section. Returns the section's diff report.
+    """
+    from models import Career, Course, CareerRecommendation  # Deferred import
+    model = _section_model(section)
+    compare = sorted({name for row in rows.values() for name in row if name != 'career'})
+    existing = _existing_rows(section, model, compare)
+
+    career_ids = {}
+    if section == 'courses':
+        career_ids = dict(db.session.execute(select(Career.name, Career.id)).all())
+
+    inserts, updates, changed_fields = [], [], {}
+    unresolved = []
+    for key, row in rows.items():
+        values = {name: value for name, value in row.items() if name != 'career'}
+        if section == 'courses':
+            if row['career'] not in career_ids:
+                unresolved.append(key)
+                continue
+            values['career_id'] = career_ids[row['career']]
+        current = existing.get(key)
+        if current is None:
+            inserts.append(values)
+            continue
+        changed = {name: value for name, value in values.items() if name in current and current[name] != value}
+        if changed:
+            updates.append({'id': current['id'], **changed})
+            changed_fields[key] = sorted(changed)
+    if unresolved:
+        raise CatalogImportError([f"courses: unknown career {key[0]!r} for course {key[1]!r}" for key in unresolved])
+
+    for start in range(0, len(inserts), chunk_size):
+        db.session.execute(insert(model), inserts[start:start + chunk_size])
+    for start in range(0, len(updates), chunk_size):
+        db.session.execute(update(model), updates[start:start + chunk_size])
+
+    removed = [key for key in existing if key not in rows] if prune else []
+    if removed:
+        removed_ids = [existing[key]['id'] for key in removed]
+        for start in range(0, len(removed_ids), chunk_size):
+            chunk = removed_ids[start:start + chunk_size]
+            if model is Career:
+                # Courses and stored results of a removed career go with it
+                db.session.execute(delete(Course).where(Course.career_id.in_(chunk)))
+                db.session.execute(delete(CareerRecommendation).where(CareerRecommendation.career_id.in_(chunk)))
+            db.session.execute(delete(model).where(model.id.in_(chunk)))
+
+    report = {
+        'added': _sample(key for key in rows if key not in existing),
+        'updated': _sample(changed_fields),
+        'unchanged': len(rows) - len(inserts) - len(updates),
+        'removed': _sample(removed),
+    }
+    report['updated']['fields'] = {
+        ' / '.join(key) if isinstance(key, tuple) else key: fields
+        for key, fields in list(changed_fields.items())[:REPORT_SAMPLE_SIZE]
+    }
+    return report
+
+
+def import_catalog(paths, section=None, prune=False, dry_run=False, chunk_size=1000):
+    """
+    Validate the catalogue files and sync them into the database in one
+    transaction. Returns the diff report per section; raises
+    CatalogImportError listing every invalid record.
+    """
+    records = {}
+    for path in paths:
+        for name, section_records in read_catalog_file(path, section).items():
+            records.setdefault(name, []).append((path, section_records))
+
+    validated, errors = {}, []
+    for name in CATALOG_SECTIONS:
+        for path, section_records in records.get(name, ()):
+            rows, section_errors = validate_section(name, section_records, path)
+            errors.extend(section_errors)
+            for key, row in rows.items():
+                if key in validated.setdefault(name, {}):
+                    errors.append(f"{path} {name}: {key!r} also appears in an earlier file")
+                validated[name][key] = row
+    if errors:
+        raise CatalogImportError(errors)
+
+    report = {}
+    try:
+        # Careers first so courses can resolve career names to ids
+        for name in CATALOG_SECTIONS:
+            if name in validated:
+                report[name] = _sync_section(name, validated[name], prune, chunk_size)
+        if dry_run:
+            db.session.rollback()
+        else:
+            # The commit bumps the catalogue revisions, so every process
+            # reloads its scoring matrix and drops stale cached results
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if not dry_run:
+        changed = any(r[kind]['count'] for r in report.values() for kind in ('added', 'updated', 'removed'))
+        if changed:
+            from catalog_cache import recommendation_cache, explanation_cache  # Deferred import
+            recommendation_cache.clear()
+            explanation_cache.clear()
+        logger.info("Imported catalogue: " + ', '.join(
+            f"{name} +{r['added']['count']} ~{r['updated']['count']} -{r['removed']['count']}"
+            for name, r in report.items()
+        ))
+    return report
@@ -0,0 +1,229 @@
+import logging
+import click
+from sqlalchemy import delete, func, select
+from app import app, db
+
+logger = logging.getLogger(__name__)
+
+
+def dedupe_recommendations():
+    """
+    Keep only the oldest CareerRecommendation row per (student, career).
+    Databases created before the unique index may hold one row per
+    /results view.
+    """
+    from models import CareerRecommendation  # Deferred import
+    keep = (
+        select(func.min(CareerRecommendation.id))
+        .group_by(CareerRecommendation.student_id, CareerRecommendation.career_id)
+        .subquery()
+    )
+    # Selecting from a derived table: MySQL rejects a DELETE whose subquery reads its target table
+    result = db.session.execute(
+        delete(CareerRecommendation).where(CareerRecommendation.id.not_in(select(keep.c[0])))
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.info(f"Removed {result.rowcount} duplicate career recommendations")
+    return result.rowcount
+
+
+def migrate_schema():
+    """
+    Bring an existing database up to the current models: create missing
+    tables, then any declared indexes that are not there yet, then the
+    catalogue revision rows. create_all only creates indexes together
+    with their tables.
+    """
+    db.create_all()
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique and table.name == 'career_recommendation':
+                dedupe_recommendations()
+            index.create(db.engine)
+            logger.info(f"Created index {index.name} on {table.name}")
+
+    from catalog_cache import seed_shared_revisions  # Deferred import
+    seed_shared_revisions()
+
+
+def hot_queries():
+    """
+    The per-request queries of each route, as (route, description, statement)
+    with representative parameter values
+    """
+    from datetime import datetime, timedelta  # Deferred import
+    from models import Student, Career, CareerRecommendation  # Deferred import
+    from recommendation_store import stored_recommendations_statement  # Deferred import
+    now = datetime.utcnow()
+    return [
+        ('/results', 'student by id', select(Student).where(Student.id == 1)),
+        # The exact statement stored_recommendations() runs, so its plan is the one checked
+        ('/results', 'stored recommendations', stored_recommendations_statement(1)),
+        ('/career/<id>', 'career by id', select(Career).where(Career.id == 1)),
+        ('/api/career-chart-data/<id>', 'stored recommendations', stored_recommendations_statement(1)),
+        ('reporting', 'students by submission date',
+         select(Student.id).where(Student.created_at.between(now - timedelta(days=7), now))),
+        ('/api/export/<table>', 'recommendations for a career',
+         select(CareerRecommendation.id).where(CareerRecommendation.career_id == 1,
+                                               CareerRecommendation.created_at >= now - timedelta(days=30))),
+    ]
+
+
+def _full_scans(dialect, plan_lines):
+    if dialect == 'sqlite':
+        # "SCAN t" reads the whole table; "SCAN t USING [COVERING] INDEX" walks an index
+        return [line for line in plan_lines if line.startswith('SCAN') and 'USING' not in line]
+    return [line for line in plan_lines if 'Seq Scan' in line]
+
+
+def explain_hot_queries(echo=print):
+    """
+    Print the query plan of every hot query and return the ones that read a
+    whole table instead of using an index
+    """
+    dialect = db.engine.dialect
+    offenders = []
+    for route, description, statement in hot_queries():
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+        if dialect.name == 'sqlite':
+            plan = [row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"))]
+        else:
+            plan = [row[0] for row in db.session.execute(db.text(f"EXPLAIN {sql}"))]
+        scans = _full_scans(dialect.name, plan)
+        echo(f"{route} - {description}{' [FULL SCAN]' if scans else ''}")
+        for line in plan:
+            echo(f"    {line}")
+        if scans:
+            offenders.append((route, description, scans))
+    return offenders
+
+
+@app.cli.command('migrate-db')
+def migrate_db_command():
+    """Create missing tables and indexes on an existing database."""
+    migrate_schema()
+    click.echo("Database schema is up to date.")
+
+
+@app.cli.command('explain-queries')
+def explain_queries_command():
+    """Print query plans for each route's queries and fail on full table scans."""
+    offenders = explain_hot_queries(echo=click.echo)
+    if offenders:
+        raise click.ClickException(f"{len(offenders)} queries scan a whole table")
+    click.echo("All hot queries use an index.")
+
+
+# Most SQL statements each route may issue once the catalogue cache is warm
+QUERY_BUDGETS = {
+    '/results': 2,
+    '/career/<id>': 1,
+    '/api/career-chart-data/<id>': 2,
+}
+
+
+def count_route_queries(student_id, career_id):
+    """
+    Request each route through the test client, twice so caches are warm,
+    and return {route: statements issued by the second request}
+    """
+    from sqlalchemy import event  # Deferred import
+    counts = {}
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    urls = {
+        '/results': '/results',
+        '/career/<id>': f'/career/{career_id}',
+        '/api/career-chart-data/<id>': f'/api/career-chart-data/{student_id}',
+    }
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['student_id'] = student_id
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for route, url in urls.items():
+            client.get(url)
+            statements.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}")
+            counts[route] = len(statements)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return counts
+
+
+@app.cli.command('check-query-counts')
+@click.option('--student-id', type=int, help='Student to render results for (default: latest)')
+@click.option('--career-id', type=int, help='Career to render details for (default: first)')
+def check_query_counts_command(student_id, career_id):
+    """Fail if any route issues more SQL statements than QUERY_BUDGETS allows."""
+    from models import Student, Career  # Deferred import
+    student_id = student_id or db.session.scalar(select(func.max(Student.id)))
+    career_id = career_id or db.session.scalar(select(func.min(Career.id)))
+    if student_id is None or career_id is None:
+        raise click.ClickException("Need at least one student and one career in the database")
+
+    over_budget = []
+    for route, count in count_route_queries(student_id, career_id).items():
+        budget = QUERY_BUDGETS[route]
+        click.echo(f"{route}: {count} queries (budget {budget})")
+        if count > budget:
+            over_budget.append(route)
+    if over_budget:
+        raise click.ClickException(f"Over query budget: {', '.join(over_budget)}")
+
+
+@app.cli.command('export-data')
+@click.argument('table', type=click.Choice(['students', 'recommendations']))
+@click.option('--format', 'export_format', type=click.Choice(['csv', 'jsonl', 'parquet']), default='csv')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output')
+@click.option('--since', help='Only rows created at or after this ISO date')
+@click.option('--until', help='Only rows created before this ISO date')
+@click.option('--career-id', type=int, help='Only rows for this career')
+@click.option('--output', '-o', help='Output file, - for stdout (default: timestamped file name)')
+def export_data_command(table, export_format, compress, since, until, career_id, output):
+    """Stream students or stored recommendations to CSV, JSON Lines or Parquet."""
+    from export import ExportError, export_rows, export_filename, parse_export_date  # Deferred import
+    try:
+        chunks = export_rows(table, export_format, compress, parse_export_date(since),
+                             parse_export_date(until), career_id)
+    except ExportError as e:
+        raise click.ClickException(str(e))
+    output = output or export_filename(table, export_format, compress)
+    written = 0
+    with click.open_file(output, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+    if output != '-':
+        click.echo(f"Wrote {written} bytes to {output}")
+
+
+@app.cli.command('import-catalog')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--section', type=click.Choice(['careers', 'courses', 'scholarships']),
+              help='Section of CSV files or bare JSON/YAML lists (default: from the file name)')
+@click.option('--prune', is_flag=True, help='Delete catalogue rows that are not in the files')
+@click.option('--dry-run', is_flag=True, help='Report the changes without writing them')
+def import_catalog_command(paths, section, prune, dry_run):
+    """Validate catalogue files and upsert careers, courses and scholarships."""
+    import json  # Deferred import
+    from catalog_import import CatalogImportError, import_catalog  # Deferred import
+    try:
+        report = import_catalog(paths, section=section, prune=prune, dry_run=dry_run)
+    except CatalogImportError as e:
+        for error in e.errors:
+            click.echo(error, err=True)
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(report, indent=2))
+    if dry_run:
+        click.echo("Dry run: nothing was written")
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from app import db
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Rows fetched per server-side cursor round trip and written per output chunk
+EXPORT_CHUNK_SIZE = 5000
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _student_columns():
+    from models import Student  # Deferred import
+    from profiles import ASSESSMENT_FIELDS  # Deferred import
+    names = ('id', 'name', 'age', 'location', 'education_level', 'preferred_language') + ASSESSMENT_FIELDS + ('created_at',)
+    return [getattr(Student, name) for name in names]
+
+
+def export_statement(table, since=None, until=None, career_id=None):
+    """
+    SELECT for one export table with the date range and career filters in
+    the WHERE clause. Students are filtered on submission time and on
+    having a stored recommendation for the career.
+    """
+    from models import Student, Career, CareerRecommendation  # Deferred import
+    if table == 'students':
+        statement = select(*_student_columns())
+        created_at = Student.created_at
+        if career_id is not None:
+            statement = statement.where(Student.id.in_(
+                select(CareerRecommendation.student_id).where(CareerRecommendation.career_id == career_id)
+            ))
+        order = Student.id
+    elif table == 'recommendations':
+        statement = (
+            select(CareerRecommendation.id, CareerRecommendation.student_id, CareerRecommendation.career_id,
+                   Career.name.label('career_name'), CareerRecommendation.match_score,
+                   CareerRecommendation.created_at)
+            .join(Career, Career.id == CareerRecommendation.career_id)
+        )
+        created_at = CareerRecommendation.created_at
+        if career_id is not None:
+            statement = statement.where(CareerRecommendation.career_id == career_id)
+        order = CareerRecommendation.id
+    else:
+        raise ExportError(f"Unknown export table '{table}', expected students or recommendations")
+
+    if since is not None:
+        statement = statement.where(created_at >= since)
+    if until is not None:
+        statement = statement.where(created_at < until)
+    return statement.order_by(order)
+
+
+def _partitions(statement, chunk_size):
+    # yield_per streams through a server-side cursor where the driver has one
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    columns = list(result.keys())
+    return columns, result.partitions()
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_chunks(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _jsonl_chunks(columns, partitions):
+    for rows in partitions:
+        yield ''.join(
+            json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False) + '\n' for row in rows
+        ).encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file that keeps what is written until drained, so the
+    Parquet writer's output can be streamed row group by row group
+    """
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Boolean):
+        return pyarrow.bool_()
+    if isinstance(column_type, Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, Float):
+        return pyarrow.float64()
+    if isinstance(column_type, DateTime):
+        return pyarrow.timestamp('us')
+    return pyarrow.string()
+
+
+def _parquet_chunks(statement, columns, partitions):
+    schema = pyarrow.schema([
+        (name, _arrow_type(column.type)) for name, column in zip(columns, statement.selected_columns)
+    ])
+    sink = _ChunkSink()
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression='snappy') as writer:
+        for rows in partitions:
+            writer.write_table(pyarrow.Table.from_pylist([dict(zip(columns, row)) for row in rows], schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_rows(table, export_format='csv', compress=False, since=None, until=None, career_id=None,
+                chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Generator of output bytes for one table. Rows are read and encoded one
+    chunk at a time, so memory use does not grow with the table.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet' and pyarrow is None:
+        raise ExportError("Parquet export needs the pyarrow package")
+
+    statement = export_statement(table, since, until, career_id)
+
+    def generate():
+        columns, partitions = _partitions(statement, chunk_size)
+        if export_format == 'csv':
+            chunks = _csv_chunks(columns, partitions)
+        elif export_format == 'jsonl':
+            chunks = _jsonl_chunks(columns, partitions)
+        else:
+            chunks = _parquet_chunks(statement, columns, partitions)
+        yield from (_gzip_chunks(chunks) if compress else chunks)
+
+    return generate()
+
+
+def export_filename(table, export_format, compress):
+    return f"{table}-{datetime.utcnow():%Y%m%dT%H%M%S}.{export_format}{'.gz' if compress else ''}"
+
+
+def parse_export_date(value):
+    """
+    ISO date or datetime from a request argument or CLI option, None if empty
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"Invalid date '{value}', expected ISO format such as 2024-06-01")
@@ -0,0 +1,207 @@
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from caching import LRUCache
+from catalog_cache import catalog_versions
+from models import Career, Course, Scholarship
+
+logger = logging.getLogger(__name__)
+
+# Tables rendered inside cached fragments; a change to any of them retires every fragment
+FRAGMENT_MODELS = (Career, Course, Scholarship)
+
+
+class _DiskStore:
+    """
+    Byte-bounded store of rendered fragments under one directory, used as
+    the spill target for fragments evicted from memory. Files are named by
+    key hash; the LRU order and sizes are tracked in memory.
+    """
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # The index is per process, so files left by an earlier process are unknown to it
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def put(self, name, html):
+        data = html.encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        temporary = self._path(f"{name}.{threading.get_ident()}.tmp")
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, self._path(name))
+        except OSError as e:
+            logger.warning(f"Could not spill fragment to disk: {str(e)}")
+            return
+
+        removed = []
+        with self._lock:
+            self._bytes += len(data) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            while self._bytes > self.max_bytes:
+                old_name, size = self._sizes.popitem(last=False)
+                self._bytes -= size
+                removed.append(old_name)
+        for old_name in removed:
+            self._remove(old_name)
+
+    def take(self, name):
+        """
+        Remove and return a stored fragment, None if there is none
+        """
+        with self._lock:
+            size = self._sizes.pop(name, None)
+            if size is None:
+                self.misses += 1
+                return None
+            self._bytes -= size
+            self.hits += 1
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read().decode('utf-8')
+        except OSError:
+            return None
+        finally:
+            self._remove(name)
+
+    def _remove(self, name):
+        try:
+            os.remove(self._path(name))
+        except OSError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            names = list(self._sizes)
+            self._sizes.clear()
+            self._bytes = 0
+        for name in names:
+            self._remove(name)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._sizes),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+class FragmentCache:
+    """
+    Render cache for template fragments wrapped in {% cache %} blocks.
+    Keys are the fragment name and the values listed in the tag (language,
+    career ids, ...) plus the catalogue versions, so a catalogue change
+    retires every fragment without explicit invalidation. Fragments evicted
+    from the in-memory LRU spill to FRAGMENT_CACHE_DIR when it is set.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._memory = None
+        self._disk = None
+        self._sync_interval = 0
+
+    def init_app(self, app):
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        size = app.config['FRAGMENT_CACHE_SIZE']
+        self.enabled = size > 0
+        if not self.enabled:
+            return
+
+        for model in FRAGMENT_MODELS:
+            catalog_versions.watch(model)
+        self._sync_interval = app.config['CATALOG_SYNC_INTERVAL']
+        directory = app.config['FRAGMENT_CACHE_DIR']
+        if directory:
+            # One directory per worker process, removed when the process exits
+            self._disk = _DiskStore(os.path.join(directory, str(os.getpid())),
+                                    app.config['FRAGMENT_CACHE_DISK_MB'] * 2 ** 20)
+            atexit.register(shutil.rmtree, self._disk.directory, True)
+        self._memory = LRUCache(max_size=size, on_evict=self._spill)
+
+    def _spill(self, key, html):
+        if self._disk is not None:
+            self._disk.put(key, html)
+
+    def key(self, name, values):
+        catalog_versions.sync(self._sync_interval)
+        versions = tuple(catalog_versions.get(model) for model in FRAGMENT_MODELS)
+        return hashlib.sha1(repr((name, values, versions)).encode('utf-8')).hexdigest()
+
+    def render(self, name, values, caller):
+        """
+        The cached rendering of a fragment, rendering it with caller() on a miss
+        """
+        if not self.enabled:
+            return caller()
+        key = self.key(name, values)
+        html = self._memory.get(key)
+        if html is None and self._disk is not None:
+            html = self._disk.take(key)
+            if html is not None:
+                html = Markup(html)
+                self._memory.set(key, html)
+        if html is None:
+            html = caller()
+            self._memory.set(key, html)
+        return html
+
+    def clear(self):
+        if self._memory is not None:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self):
+        if not self.enabled:
+            return {'enabled': False}
+        stats = self._memory.stats()
+        stats['enabled'] = True
+        if self._disk is not None:
+            stats['disk'] = self._disk.stats()
+        return stats
+
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'name', value, ... %}...{% endcache %}: render the body once per
+    distinct name, values and catalogue version. The body must only depend
+    on the listed values and catalogue rows.
+    """
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        values = []
+        while parser.stream.skip_if('comma'):
+            values.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_render', [name, nodes.Tuple(values, 'load')])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, name, values, caller):
+        return self.environment.fragment_cache.render(name, values, caller)
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,54 @@
+"""
+Production WSGI serving:
+
+    gunicorn -c gunicorn.conf.py
+
+Threaded workers by default. Sizing guidance and benchmark numbers are in
+the README; every setting can be overridden from the environment.
+"""
+import multiprocessing
+import os
+import subprocess
+import sys
+
+wsgi_app = os.environ.get("GUNICORN_APP", "main:app")
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# One process per core; each process serves `threads` requests at a time.
+# Requests mostly wait on the database, so threads rather than processes
+# absorb concurrency. Scoring holds the GIL, so more processes (not
+# threads) are the lever when CPU bound.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+# Idle keep-alive connections per worker; they are parked in a selector, not on a thread
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+backlog = int(os.environ.get("GUNICORN_BACKLOG", 2048))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+# The app starts background threads (write-behind queue, profiler) at import,
+# and threads do not survive fork, so each worker imports it itself
+preload_app = False
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """
+    Migrate the schema and seed the catalogue once, before any worker starts.
+    Runs in a child process so the master never imports the app.
+    """
+    if os.environ.get("INIT_DB_ON_START", "true").lower() != "true":
+        return
+    subprocess.run(
+        [sys.executable, "-c", "from app import init_db_and_data; init_db_and_data()"],
+        check=True
+    )
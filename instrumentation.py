@@ -0,0 +1,226 @@
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Phases reported per request, in Server-Timing order
+PHASES = ('db', 'ml', 'render', 'session')
+
+# Upper bounds in seconds of the request latency histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_SPAN = nullcontext()
+
+
+class RequestTimings:
+    __slots__ = ('started', 'phases', 'queries', 'render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.render_started = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ('timings', 'phase', 'started')
+
+    def __init__(self, timings, phase):
+        self.timings = timings
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.phase, time.perf_counter() - self.started)
+        return False
+
+
+def _current_timings():
+    if not has_request_context():
+        return None
+    return g.get('_request_timings')
+
+
+class Instrumentation:
+    """
+    Opt-in per-request timing. When enabled, every request records time
+    spent in SQL statements (db), scoring (ml), template rendering (render)
+    and session commits (session), returns them as a Server-Timing header
+    and aggregates them for /metrics. When disabled no hooks are installed
+    and span() hands back a shared no-op context manager.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._histograms = {}
+        self._phase_seconds = {}
+        self._queries = {}
+
+    def init_app(self, app):
+        self.enabled = app.config['INSTRUMENTATION_ENABLED']
+        if not self.enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        event.listen(Engine, 'before_cursor_execute', self._query_started)
+        event.listen(Engine, 'after_cursor_execute', self._query_finished)
+        event.listen(Session, 'before_commit', self._commit_started)
+        event.listen(Session, 'after_commit', self._commit_finished)
+        event.listen(Session, 'after_soft_rollback', self._commit_abandoned)
+        logger.info("Request instrumentation enabled")
+
+    def span(self, phase):
+        """
+        Context manager timing the enclosed block as part of `phase`
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        timings = _current_timings()
+        if timings is None:
+            return _NULL_SPAN
+        return _Span(timings, phase)
+
+    # Request hooks
+
+    def _start_request(self):
+        g._request_timings = RequestTimings()
+
+    def _finish_request(self, response):
+        timings = g.pop('_request_timings', None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.started
+        response.headers['Server-Timing'] = self._server_timing(timings, total)
+        self._record(request.endpoint or 'unmatched', request.method, response.status_code, timings, total)
+        return response
+
+    @staticmethod
+    def _server_timing(timings, total):
+        entries = []
+        for phase, seconds in timings.phases.items():
+            entry = f"{phase};dur={seconds * 1000:.2f}"
+            if phase == 'db':
+                entry += f';desc="{timings.queries} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ', '.join(entries)
+
+    def _render_started(self, sender, template, context, **extra):
+        timings = _current_timings()
+        if timings is not None:
+            timings.render_started = time.perf_counter()
+
+    def _render_finished(self, sender, template, context, **extra):
+        timings = _current_timings()
+        if timings is not None and timings.render_started is not None:
+            timings.add('render', time.perf_counter() - timings.render_started)
+            timings.render_started = None
+
+    # SQLAlchemy hooks
+
+    def _query_started(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_timings() is not None:
+            conn.info.setdefault('_query_started', []).append(time.perf_counter())
+
+    def _query_finished(self, conn, cursor, statement, parameters, context, executemany):
+        timings = _current_timings()
+        started = conn.info.get('_query_started')
+        if timings is not None and started:
+            timings.add('db', time.perf_counter() - started.pop())
+            timings.queries += 1
+
+    def _commit_started(self, session):
+        if _current_timings() is not None:
+            session.info['_commit_started'] = time.perf_counter()
+
+    def _commit_finished(self, session):
+        started = session.info.pop('_commit_started', None)
+        timings = _current_timings()
+        if timings is not None and started is not None:
+            timings.add('session', time.perf_counter() - started)
+
+    def _commit_abandoned(self, session, previous_transaction):
+        session.info.pop('_commit_started', None)
+
+    # Aggregates
+
+    def _record(self, endpoint, method, status, timings, total):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = [[0] * len(LATENCY_BUCKETS), 0, 0.0]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if total <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += 1
+            histogram[2] += total
+
+            for phase, seconds in timings.phases.items():
+                key = (endpoint, phase)
+                self._phase_seconds[key] = self._phase_seconds.get(key, 0.0) + seconds
+            self._queries[endpoint] = self._queries.get(endpoint, 0) + timings.queries
+
+    def reset(self):
+        with self._lock:
+            self._requests.clear()
+            self._histograms.clear()
+            self._phase_seconds.clear()
+            self._queries.clear()
+
+    def render_metrics(self, samples=()):
+        """
+        All aggregates in the Prometheus text exposition format. `samples` is
+        an iterable of (name, type, help, value) read by the caller at scrape time.
+        """
+        lines = []
+        with self._lock:
+            lines.append('# HELP http_requests_total Requests handled, by endpoint, method and status.')
+            lines.append('# TYPE http_requests_total counter')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            lines.append('# HELP http_request_duration_seconds Request latency, by endpoint.')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for endpoint, (buckets, count, total) in sorted(self._histograms.items()):
+                for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {bucket_count}')
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {count}')
+                lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {total:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {count}')
+
+            lines.append('# HELP http_request_phase_seconds_total Time spent per request phase, by endpoint.')
+            lines.append('# TYPE http_request_phase_seconds_total counter')
+            for (endpoint, phase), seconds in sorted(self._phase_seconds.items()):
+                lines.append(f'http_request_phase_seconds_total{{endpoint="{endpoint}",phase="{phase}"}} {seconds:.6f}')
+
+            lines.append('# HELP db_queries_total SQL statements executed, by endpoint.')
+            lines.append('# TYPE db_queries_total counter')
+            for endpoint, count in sorted(self._queries.items()):
+                lines.append(f'db_queries_total{{endpoint="{endpoint}"}} {count}')
+
+        for name, metric_type, help_text, value in samples:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+instrumentation = Instrumentation()
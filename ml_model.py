@@ -1,11 +1,171 @@
+import heapq
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from models import Career, Student
+from profiles import StudentProfile, answer_matrix, SKILL_FIELDS, INTEREST_FIELDS
 import logging
 
+# Career columns the student answers are scored against, in scoring order
+CAREER_SKILL_FIELDS = ('technical_weight', 'communication_weight', 'analytical_weight',
+                       'creative_weight', 'leadership_weight')
+CAREER_INTEREST_FIELDS = ('technology_alignment', 'arts_alignment', 'business_alignment', 'healthcare_alignment',
+                          'education_alignment', 'agriculture_alignment', 'government_alignment')
+CAREER_PERSONALITY_FIELDS = ('extroversion_fit', 'conscientiousness_fit', 'openness_fit', 'agreeableness_fit')
+
+
+def profile_matrix(students):
+    """
+    Assessment answers scaled to the 0-1 range used by the scoring formula
+    """
+    return answer_matrix(students) / 5.0
+
+
+def profile_key(student):
+    """
+    Hashable key for a student's answers: the packed bytes of its StudentProfile
+    """
+    return StudentProfile.coerce(student).key
+
+
+# Labels used in explanation reasons, in SKILL_FIELDS and INTEREST_FIELDS order
+SKILL_LABELS = ('Technical', 'Communication', 'Analytical', 'Creative', 'Leadership')
+INTEREST_LABELS = ('Technology', 'Arts', 'Business', 'Healthcare', 'Education', 'Agriculture', 'Government')
+
+
+def explanation_reasons(answers, career_skills, career_interests, rural):
+    """
+    Reasons a career suits a student: skills the career weights above 0.5
+    where the student answered 3 or more, interests the career aligns with
+    above 0.5 where the student answered 4 or more, and rural opportunities
+    """
+    skill_answers = answers[:len(SKILL_FIELDS)]
+    interest_answers = answers[len(SKILL_FIELDS):len(SKILL_FIELDS) + len(INTEREST_FIELDS)]
+    reasons = [
+        f"Strong {SKILL_LABELS[i].lower()} skills match career requirements"
+        for i in np.flatnonzero((career_skills > 0.5) & (skill_answers >= 3))
+    ]
+    reasons.extend(
+        f"High interest in {INTEREST_LABELS[i].lower()} aligns well with this career"
+        for i in np.flatnonzero((career_interests > 0.5) & (interest_answers >= 4))
+    )
+    if rural:
+        reasons.append("Good opportunities available in rural areas")
+    return reasons if reasons else ["General compatibility based on overall profile"]
+
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k highest scores, best first, with equal scores kept in
+    catalogue order. Uses partial selection so only the winners get sorted.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    
+    threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+    # Take every score tied with the k-th so ties resolve by position, not by partition order
+    candidates = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+
+class CareerMatrix:
+    """
+    All career weights packed into row-aligned arrays so a student can be
+    scored against the whole catalogue in one vectorized pass.
+    """
+    # Row-aligned arrays scoring reads: the weights and their precomputed terms
+    ARRAY_FIELDS = ('skills', 'interests', 'personality', 'rural', 'ids', 'skills_required',
+                    'skills_divisor', 'personality_missing', 'personality_unit', 'rural_boost')
+
+    def __init__(self, skills, interests, personality, rural, careers=()):
+        self.skills = np.asarray(skills, dtype=np.float64).reshape(-1, len(CAREER_SKILL_FIELDS))
+        self.interests = np.asarray(interests, dtype=np.float64).reshape(-1, len(CAREER_INTEREST_FIELDS))
+        self.personality = np.asarray(personality, dtype=np.float64).reshape(-1, len(CAREER_PERSONALITY_FIELDS))
+        self.rural = np.asarray(rural, dtype=bool).reshape(-1)
+        self.careers = list(careers)
+        if self.careers:
+            self.ids = np.array([career.id for career in self.careers], dtype=np.int64)
+        else:
+            self.ids = np.arange(len(self.rural), dtype=np.int64)
+        self._positions = None
+        # Catalogue version this matrix was built from, set by CareerCatalog
+        self.version = None
+        # Optional CareerIndex for candidate generation on large catalogues
+        self.index = None
+        # Optional ScoreTables with partial scores for every possible answer
+        self.tables = None
+
+        # Precomputed per-career terms of the scoring formula
+        self.skills_required = self.skills > 0
+        self.skills_divisor = np.where(self.skills_required, self.skills, 1.0)
+        personality_norms = np.sqrt(np.einsum('ij,ij->i', self.personality, self.personality))
+        self.personality_missing = personality_norms == 0
+        self.personality_unit = self.personality / np.where(self.personality_missing, 1.0, personality_norms)[:, None]
+        self.rural_boost = np.where(self.rural, 1.1, 1.0)
+
+    def __len__(self):
+        return self.skills.shape[0]
+    
+    def index_of(self, career_id):
+        """
+        Row position of a career id, or None if it is not in the matrix
+        """
+        if self._positions is None:
+            self._positions = {int(career_id): i for i, career_id in enumerate(self.ids)}
+        return self._positions.get(career_id)
+
+    def take(self, positions):
+        """
+        Matrix of the careers at the given row positions, reusing the
+        precomputed scoring terms instead of deriving them again
+        """
+        subset = CareerMatrix.from_arrays({name: getattr(self, name)[positions] for name in self.ARRAY_FIELDS},
+                                          [self.careers[i] for i in positions] if self.careers else [])
+        subset.version = self.version
+        return subset
+
+    @classmethod
+    def from_arrays(cls, arrays, careers=()):
+        """
+        Matrix over existing ARRAY_FIELDS arrays, used as they are (no copy,
+        no recomputation), e.g. views of shared memory
+        """
+        matrix = object.__new__(cls)
+        for name in cls.ARRAY_FIELDS:
+            setattr(matrix, name, arrays[name])
+        matrix.careers = list(careers)
+        matrix._positions = None
+        matrix.version = None
+        matrix.index = None
+        matrix.tables = None
+        return matrix
+
+    @classmethod
+    def from_careers(cls, careers):
+        """
+        Build the matrix from Career rows (ORM objects or column tuples)
+        """
+        careers = list(careers)
+        return cls(
+            skills=[[getattr(career, field) or 0.0 for field in CAREER_SKILL_FIELDS] for career in careers],
+            interests=[[getattr(career, field) or 0.0 for field in CAREER_INTEREST_FIELDS] for career in careers],
+            personality=[[getattr(career, field) or 0.0 for field in CAREER_PERSONALITY_FIELDS] for career in careers],
+            rural=[bool(career.rural_opportunities) for career in careers],
+            careers=careers
+        )
+
+
 class CareerRecommendationEngine:
-    def __init__(self):
+    # Upper bound on intermediate array cells per batch scoring chunk
+    BATCH_CELLS = 4_000_000
+    # Ranked careers kept per memoized profile; /results and the chart take 8 and 6
+    CACHED_DEPTH = 10
+    
+    def __init__(self, vectorized=True):
         self.logger = logging.getLogger(__name__)
+        self.vectorized = vectorized
     
     def calculate_match_score(self, student, career):
         """
@@ -120,64 +280,221 @@ class CareerRecommendationEngine:
         similarity = cosine_similarity([student_personality], [career_personality_fit])[0][0]
         return (similarity + 1) / 2  # Convert from [-1, 1] to [0, 1]
     
-    def get_career_recommendations(self, student, top_k=10):
+    def calculate_match_scores(self, student, career_matrix):
         """
-        Get top career recommendations for a student
+        Calculate match scores between a student and every career in a CareerMatrix.
+        Uses the same formula as calculate_match_score, one array operation per term.
+        """
+        try:
+            return self.calculate_match_score_matrix(profile_matrix([student]), career_matrix)[0]
+        except Exception as e:
+            self.logger.error(f"Error calculating match scores: {str(e)}")
+            return np.zeros(len(career_matrix))
+    
+    def calculate_match_score_matrix(self, profiles, career_matrix):
+        """
+        Calculate the students x careers score matrix for profiles built by profile_matrix
         """
-        from app import db
+        tables = career_matrix.tables
+        if tables is None:
+            return self._formula_score_matrix(profiles, career_matrix)
         
-        careers = Career.query.all()
-        recommendations = []
+        # Table lookups for integer 1-5 answers, the formula for anything else
+        rows = [tables.rows_for(answers) for answers in profiles * 5.0]
+        scores = np.empty((len(profiles), len(career_matrix)))
+        computed = [i for i, profile_rows in enumerate(rows) if profile_rows is None]
+        for i, profile_rows in enumerate(rows):
+            if profile_rows is not None:
+                scores[i] = tables.scores(profile_rows)
+        if computed:
+            scores[computed] = self._formula_score_matrix(profiles[computed], career_matrix)
+        return scores
+    
+    def _formula_score_matrix(self, profiles, career_matrix):
+        return self._combine_block_scores(*self._block_scores(profiles, career_matrix), career_matrix)
+    
+    def _block_scores(self, profiles, career_matrix):
+        """
+        Skills, interests and personality sub-scores, each students x careers
+        """
+        student_skills = profiles[:, :len(SKILL_FIELDS)]
+        student_interests = profiles[:, len(SKILL_FIELDS):len(SKILL_FIELDS) + len(INTEREST_FIELDS)]
+        student_personality = profiles[:, len(SKILL_FIELDS) + len(INTEREST_FIELDS):]
         
-        for career in careers:
-            match_score = self.calculate_match_score(student, career)
-            recommendations.append({
-                'career': career,
-                'match_score': match_score,
-                'match_percentage': int(match_score * 100)
-            })
+        # Skills: min(student / requirement, 1) * requirement, or 0.1 * student if not required
+        skill_matches = np.where(
+            career_matrix.skills_required,
+            np.minimum(student_skills[:, None, :] / career_matrix.skills_divisor, 1.0) * career_matrix.skills,
+            student_skills[:, None, :] * 0.1
+        )
+        skills_scores = skill_matches.mean(axis=2)
         
-        # Sort by match score descending
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+        # Elementwise products summed per row rather than BLAS matmul, so a student's
+        # scores do not depend on how many other students share the batch
+        interests_scores = (student_interests[:, None, :] * career_matrix.interests).sum(axis=2) / len(INTEREST_FIELDS)
         
-        return recommendations[:top_k]
+        # Personality: cosine similarity mapped to [0, 1], neutral 0.5 if either side is empty
+        student_norms = np.sqrt(np.einsum('ij,ij->i', student_personality, student_personality))
+        student_missing = student_norms == 0
+        student_unit = student_personality / np.where(student_missing, 1.0, student_norms)[:, None]
+        similarity = (student_unit[:, None, :] * career_matrix.personality_unit).sum(axis=2)
+        personality_scores = np.where(
+            student_missing[:, None] | career_matrix.personality_missing,
+            0.5,
+            (similarity + 1) / 2
+        )
+        return skills_scores, interests_scores, personality_scores
     
-    def get_explanation(self, student, career):
+    def _combine_block_scores(self, skills_scores, interests_scores, personality_scores, career_matrix):
+        final_scores = (
+            0.4 * skills_scores +
+            0.4 * interests_scores +
+            0.2 * personality_scores
+        )
+        final_scores *= career_matrix.rural_boost
+        
+        return np.minimum(final_scores, 1.0)
+    
+    def score_and_explain(self, student, career_id, career_matrix=None):
         """
-        Generate explanation for why a career was recommended
+        Match score, per-block sub-scores and explanation reasons for one
+        career, computed in one pass over the career's matrix row. Returns
+        None if the career is not in the catalogue. Without an explicit
+        matrix the result is memoized per (answers, career, catalogue version).
         """
-        reasons = []
+        profile = StudentProfile.coerce(student)
+        if career_matrix is not None:
+            return self._score_and_explain(profile, career_id, career_matrix)
         
-        # Check skill alignment
-        student_skills = [
-            ('Technical', student.technical_skills, career.technical_weight),
-            ('Communication', student.communication_skills, career.communication_weight),
-            ('Analytical', student.analytical_skills, career.analytical_weight),
-            ('Creative', student.creative_skills, career.creative_weight),
-            ('Leadership', student.leadership_skills, career.leadership_weight)
-        ]
+        from catalog_cache import career_catalog, explanation_cache  # Deferred import
+        career_matrix = career_catalog.get_matrix()
+        key = (profile.key, career_id, career_matrix.version)
+        result = explanation_cache.get(key)
+        if result is None:
+            result = self._score_and_explain(profile, career_id, career_matrix)
+            if result is not None:
+                explanation_cache.set(key, result)
+        return result
+    
+    def _score_and_explain(self, profile, career_id, career_matrix):
+        position = career_matrix.index_of(career_id)
+        if position is None:
+            return None
+        career = career_matrix.take([position])
+        answers = profile.answers
+        blocks = self._block_scores(answers[None, :] / 5.0, career)
+        match_score = float(self._combine_block_scores(*blocks, career)[0, 0])
+        skills_score, interests_score, personality_score = (float(block[0, 0]) for block in blocks)
+        return {
+            'match_score': match_score,
+            'match_percentage': int(match_score * 100),
+            'skills_score': skills_score,
+            'interests_score': interests_score,
+            'personality_score': personality_score,
+            'reasons': explanation_reasons(answers, career.skills[0], career.interests[0], career.rural[0]),
+        }
+    
+    def get_career_recommendations(self, student, top_k=10, career_matrix=None):
+        """
+        Get top career recommendations for a student
+        """
+        if self.vectorized:
+            # Packed once; scoring and the cache key both read the profile
+            profile = StudentProfile.coerce(student)
+            if career_matrix is None:
+                from catalog_cache import career_catalog  # Deferred import
+                ranked = self._ranked_careers_cached(profile, career_catalog.get_matrix(), top_k)
+            else:
+                ranked = self._ranked_careers(profile, career_matrix, top_k)
+            return [
+                {
+                    'career': career,
+                    'match_score': match_score,
+                    'match_percentage': int(match_score * 100)
+                }
+                for career, match_score in ranked
+            ]
         
-        for skill_name, student_level, career_requirement in student_skills:
-            if career_requirement > 0.5 and student_level >= 3:
-                reasons.append(f"Strong {skill_name.lower()} skills match career requirements")
-        
-        # Check interest alignment
-        student_interests = [
-            ('Technology', student.interest_technology, career.technology_alignment),
-            ('Arts', student.interest_arts, career.arts_alignment),
-            ('Business', student.interest_business, career.business_alignment),
-            ('Healthcare', student.interest_healthcare, career.healthcare_alignment),
-            ('Education', student.interest_education, career.education_alignment),
-            ('Agriculture', student.interest_agriculture, career.agriculture_alignment),
-            ('Government', student.interest_government, career.government_alignment)
+        careers = Career.query.all()
+        scores = [self.calculate_match_score(student, career) for career in careers]
+        
+        # Highest scores first, earlier catalogue position wins ties
+        winners = heapq.nsmallest(top_k, range(len(careers)), key=lambda i: (-scores[i], i))
+        
+        return [
+            {
+                'career': careers[i],
+                'match_score': scores[i],
+                'match_percentage': int(scores[i] * 100)
+            }
+            for i in winners
         ]
+    
+    def _ranked_careers(self, student, career_matrix, top_k):
+        if career_matrix.index is not None:
+            # Approximate candidates, exact scores
+            positions, scores = career_matrix.index.search(self, profile_matrix([student])[0], top_k)
+            return [(career_matrix.careers[i], float(score)) for i, score in zip(positions, scores)]
+        scores = self.calculate_match_scores(student, career_matrix)
+        return [(career_matrix.careers[i], float(scores[i])) for i in top_k_indices(scores, top_k)]
+    
+    def _ranked_careers_cached(self, student, career_matrix, top_k):
+        """
+        Ranked careers memoized per (answers, catalogue version). Entries hold
+        at least CACHED_DEPTH careers so different top_k values share them.
+        """
+        from catalog_cache import recommendation_cache  # Deferred import
+        try:
+            key = (profile_key(student), career_matrix.version)
+        except (TypeError, ValueError):
+            return self._ranked_careers(student, career_matrix, top_k)
         
-        for interest_name, student_level, career_alignment in student_interests:
-            if career_alignment > 0.5 and student_level >= 4:
-                reasons.append(f"High interest in {interest_name.lower()} aligns well with this career")
+        ranked = recommendation_cache.get(key)
+        if ranked is None or (len(ranked) < top_k and len(ranked) < len(career_matrix)):
+            ranked = self._ranked_careers(student, career_matrix, max(top_k, self.CACHED_DEPTH))
+            recommendation_cache.set(key, ranked)
+        return ranked[:top_k]
+    
+    def get_batch_recommendations(self, students, top_k=10, career_matrix=None, chunk_size=None):
+        """
+        Get top career recommendations for many students at once.
+        Students can be StudentProfiles, Student rows, column rows or dicts with
+        the 16 assessment fields.
+        Returns one recommendation list per student, in input order.
+        """
+        if career_matrix is None:
+            from catalog_cache import career_catalog  # Deferred import
+            career_matrix = career_catalog.get_matrix()
         
-        # Rural opportunities
-        if career.rural_opportunities:
-            reasons.append("Good opportunities available in rural areas")
+        profiles = profile_matrix(students)
+        if len(career_matrix) == 0:
+            return [[] for _ in range(len(profiles))]
         
-        return reasons if reasons else ["General compatibility based on overall profile"]
\ No newline at end of file
+        # Bound the students x careers x fields intermediates to ~BATCH_CELLS floats
+        if chunk_size is None:
+            chunk_size = max(1, self.BATCH_CELLS // (len(career_matrix) * len(INTEREST_FIELDS)))
+        
+        results = []
+        for start in range(0, len(profiles), chunk_size):
+            scores = self.calculate_match_score_matrix(profiles[start:start + chunk_size], career_matrix)
+            for row_scores in scores:
+                results.append([
+                    {
+                        'career': career_matrix.careers[i],
+                        'match_score': float(row_scores[i]),
+                        'match_percentage': int(row_scores[i] * 100)
+                    }
+                    for i in top_k_indices(row_scores, top_k)
+                ])
+        return results
+    
+    def get_explanation(self, student, career):
+        """
+        Generate explanation for why a career was recommended
+        """
+        return explanation_reasons(
+            StudentProfile.coerce(student).answers,
+            np.array([getattr(career, field) for field in CAREER_SKILL_FIELDS], dtype=np.float64),
+            np.array([getattr(career, field) for field in CAREER_INTEREST_FIELDS], dtype=np.float64),
+            career.rural_opportunities
+        )
@@ -1,5 +1,5 @@
 from app import db
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -33,7 +33,7 @@ class Student(db.Model):
     openness = Column(Float, default=0.0)
     agreeableness = Column(Float, default=0.0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     recommendations = relationship("CareerRecommendation", back_populates="student")
@@ -81,7 +81,7 @@ class Course(db.Model):
     duration = Column(String(50))
     level = Column(String(20))  # Beginner, Intermediate, Advanced
     is_free = Column(Boolean, default=True)
-    career_id = Column(Integer, ForeignKey('career.id'))
+    career_id = Column(Integer, ForeignKey('career.id'), index=True)
     career = relationship("Career")
 
 class Scholarship(db.Model):
@@ -93,9 +93,18 @@ class Scholarship(db.Model):
     eligibility = Column(Text)
     application_url = Column(String(500))
     deadline = Column(String(100))
-    for_rural_students = Column(Boolean, default=False)
+    for_rural_students = Column(Boolean, default=False, index=True)
 
 class CareerRecommendation(db.Model):
+    __table_args__ = (
+        # One stored result per student and career, so re-viewing results upserts instead of appending
+        Index('uq_career_recommendation_student_career', 'student_id', 'career_id', unique=True),
+        # A student's stored result set, read best first
+        Index('ix_career_recommendation_student_score', 'student_id', 'match_score'),
+        # Export filters by career and creation date
+        Index('ix_career_recommendation_career_created', 'career_id', 'created_at'),
+    )
+    
     id = Column(Integer, primary_key=True)
     student_id = Column(Integer, ForeignKey('student.id'), nullable=False)
     career_id = Column(Integer, ForeignKey('career.id'), nullable=False)
@@ -104,4 +113,10 @@ class CareerRecommendation(db.Model):
     
     # Relationships
     student = relationship("Student", back_populates="recommendations")
-    career = relationship("Career")
\ No newline at end of file
+    career = relationship("Career")
+
+class CatalogRevision(db.Model):
+    """Shared change counter per catalogue table, so every process can tell when to reload"""
+    name = Column(String(50), primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
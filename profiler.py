@@ -0,0 +1,203 @@
+import bisect
+import hmac
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile-Secret'
+
+
+class StackSampler:
+    """
+    Statistical profiler for one thread: a helper thread reads the target's
+    current frame every `interval` seconds and counts each call stack.
+    """
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """
+        Stacks in the collapsed format read by flamegraph.pl and speedscope
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    __slots__ = ('id', 'method', 'path', 'endpoint', 'status', 'duration', 'samples',
+                 'started_at', 'collapsed', 'filename')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'endpoint': self.endpoint,
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 2),
+            'samples': self.samples,
+            'started_at': self.started_at.isoformat() + 'Z',
+            'file': self.filename,
+        }
+
+
+class RequestProfiler:
+    """
+    Samples a single request when it carries the PROFILER_SECRET in the
+    X-Profile-Secret header, or every request when PROFILE_ALL_REQUESTS is
+    set. Each profile is written to PROFILER_DIR as a collapsed-stack file,
+    and the slowest PROFILER_KEEP profiles stay in memory for /admin/profiles.
+    Only one request is sampled at a time.
+    """
+    def __init__(self):
+        self.secret = None
+        self.profile_all = False
+        self.interval = 0.005
+        self.keep = 20
+        self.directory = None
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._slowest = []  # Sorted by (-duration, id), slowest first
+
+    @property
+    def enabled(self):
+        return bool(self.secret) or self.profile_all
+
+    def init_app(self, app):
+        self.secret = app.config['PROFILER_SECRET']
+        self.profile_all = app.config['PROFILE_ALL_REQUESTS']
+        self.interval = app.config['PROFILER_INTERVAL']
+        self.keep = app.config['PROFILER_KEEP']
+        self.directory = app.config['PROFILER_DIR']
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._abandon_request)
+        logger.info(f"Request profiler enabled, writing profiles to {self.directory}")
+
+    def authorized(self):
+        """
+        Whether the current request carries the profiler secret
+        """
+        supplied = request.headers.get(PROFILE_HEADER)
+        return bool(self.secret and supplied) and hmac.compare_digest(supplied, self.secret)
+
+    def profiles(self):
+        with self._lock:
+            return [profile.to_dict() for _, profile in self._slowest]
+
+    def get_profile(self, profile_id):
+        with self._lock:
+            for _, profile in self._slowest:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    # Request hooks
+
+    def _start_request(self):
+        if not (self.profile_all or self.authorized()):
+            return
+        if not self._busy.acquire(blocking=False):
+            return
+        g._profiler = (StackSampler(threading.get_ident(), self.interval).start(),
+                       time.perf_counter(), datetime.utcnow())
+
+    def _finish_request(self, response):
+        state = g.pop('_profiler', None)
+        if state is None:
+            return response
+        sampler, started, started_at = state
+        duration = time.perf_counter() - started
+        sampler.stop()
+        self._busy.release()
+
+        profile = RequestProfile()
+        profile.id = next(self._ids)
+        profile.method = request.method
+        profile.path = request.path
+        profile.endpoint = request.endpoint or 'unmatched'
+        profile.status = response.status_code
+        profile.duration = duration
+        profile.samples = sampler.samples
+        profile.started_at = started_at
+        profile.collapsed = sampler.collapsed()
+        profile.filename = None
+        try:
+            profile.filename = self._write(profile)
+        except OSError as e:
+            logger.error(f"Could not write profile {profile.id}: {str(e)}")
+        self._remember(profile)
+        response.headers['X-Profile-Id'] = str(profile.id)
+        return response
+
+    def _abandon_request(self, error):
+        # after_request does not run when a view raises
+        state = g.pop('_profiler', None)
+        if state is not None:
+            state[0].stop()
+            self._busy.release()
+
+    def _write(self, profile):
+        filename = os.path.join(
+            self.directory,
+            f"{profile.started_at:%Y%m%dT%H%M%S}-{profile.id}-{profile.endpoint}-{int(profile.duration * 1000)}ms.folded"
+        )
+        with open(filename, 'w') as f:
+            f.write(profile.collapsed)
+        return filename
+
+    def _remember(self, profile):
+        """
+        Keep the profile if it is among the slowest `keep` seen so far and
+        delete the file of any profile it pushes out
+        """
+        evicted = None
+        with self._lock:
+            bisect.insort(self._slowest, ((-profile.duration, profile.id), profile))
+            if len(self._slowest) > self.keep:
+                _, evicted = self._slowest.pop()
+        if evicted is not None and evicted.filename:
+            try:
+                os.remove(evicted.filename)
+            except OSError:
+                pass
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,134 @@
+import numpy as np
+
+# Student answers in scoring order
+SKILL_FIELDS = ('technical_skills', 'communication_skills', 'analytical_skills',
+                'creative_skills', 'leadership_skills')
+INTEREST_FIELDS = ('interest_technology', 'interest_arts', 'interest_business', 'interest_healthcare',
+                   'interest_education', 'interest_agriculture', 'interest_government')
+PERSONALITY_FIELDS = ('extroversion', 'conscientiousness', 'openness', 'agreeableness')
+ASSESSMENT_FIELDS = SKILL_FIELDS + INTEREST_FIELDS + PERSONALITY_FIELDS
+
+_FIELD_INDEX = {field: i for i, field in enumerate(ASSESSMENT_FIELDS)}
+
+
+def _pack(answers):
+    """
+    One uint8 per answer when every answer is a whole number 0-255 (always
+    the case for form submissions), the exact float64 values otherwise
+    """
+    if np.all((answers >= 0) & (answers <= 255) & (answers == np.round(answers))):
+        return answers.astype(np.uint8).tobytes()
+    return answers.tobytes()
+
+
+class StudentProfile:
+    """
+    The 16 assessment answers of one student packed into a bytes object.
+    Integer answers take 16 bytes; the packed bytes double as the cache key.
+    Answers are also readable by field name, so a profile can stand in for a
+    Student wherever only the answers are used.
+    """
+    __slots__ = ('packed',)
+
+    def __init__(self, answers):
+        answers = np.asarray(answers, dtype=np.float64).reshape(len(ASSESSMENT_FIELDS))
+        self.packed = _pack(answers)
+
+    @classmethod
+    def from_packed(cls, packed):
+        profile = cls.__new__(cls)
+        profile.packed = packed
+        return profile
+
+    @classmethod
+    def from_student(cls, student):
+        """
+        Profile of a Student row, a column row or any object with the answer attributes
+        """
+        return cls([getattr(student, field) for field in ASSESSMENT_FIELDS])
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls([values[field] for field in ASSESSMENT_FIELDS])
+
+    @classmethod
+    def from_form(cls, form):
+        return cls([getattr(form, field).data for field in ASSESSMENT_FIELDS])
+
+    @classmethod
+    def coerce(cls, student):
+        """
+        Return student as a StudentProfile, converting dicts, Student rows and column rows
+        """
+        if isinstance(student, cls):
+            return student
+        if isinstance(student, dict):
+            return cls.from_dict(student)
+        return cls.from_student(student)
+
+    @classmethod
+    def from_rows(cls, answers):
+        """
+        Profiles for every row of an (n, 16) answer array, packed in one pass
+        """
+        answers = np.asarray(answers, dtype=np.float64).reshape(-1, len(ASSESSMENT_FIELDS))
+        integral = np.all((answers >= 0) & (answers <= 255) & (answers == np.round(answers)), axis=1)
+        packed_rows = answers.astype(np.uint8)
+        return [
+            cls.from_packed(packed_rows[i].tobytes() if integral[i] else answers[i].tobytes())
+            for i in range(len(answers))
+        ]
+
+    @property
+    def is_integral(self):
+        return len(self.packed) == len(ASSESSMENT_FIELDS)
+
+    @property
+    def answers(self):
+        """
+        The answers as a float64 array
+        """
+        dtype = np.uint8 if self.is_integral else np.float64
+        return np.frombuffer(self.packed, dtype=dtype).astype(np.float64)
+
+    @property
+    def key(self):
+        return self.packed
+
+    def to_dict(self):
+        return dict(zip(ASSESSMENT_FIELDS, self.answers.tolist()))
+
+    def to_student(self, **details):
+        """
+        New Student row with these answers and the given name, age, etc.
+        """
+        from models import Student  # Deferred import
+        return Student(**details, **self.to_dict())
+
+    def __getattr__(self, name):
+        index = _FIELD_INDEX.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return float(self.answers[index])
+
+    def __eq__(self, other):
+        return isinstance(other, StudentProfile) and self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __repr__(self):
+        return f"StudentProfile({self.answers.tolist()})"
+
+
+def answer_matrix(students):
+    """
+    Stack the 16 raw answers of profiles, Student rows, column rows or dicts
+    into an (n_students, 16) float64 array
+    """
+    profiles = [StudentProfile.coerce(student) for student in students]
+    if profiles and all(profile.is_integral for profile in profiles):
+        # All packed as uint8: one buffer, one conversion
+        packed = np.frombuffer(b''.join(profile.packed for profile in profiles), dtype=np.uint8)
+        return packed.reshape(-1, len(ASSESSMENT_FIELDS)).astype(np.float64)
+    return np.array([profile.answers for profile in profiles], dtype=np.float64).reshape(-1, len(ASSESSMENT_FIELDS))
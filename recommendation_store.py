@@ -0,0 +1,186 @@
+import logging
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from models import Student, CareerRecommendation
+from profiles import StudentProfile, ASSESSMENT_FIELDS
+from write_behind import write_queue
+
+logger = logging.getLogger(__name__)
+
+STUDENT_DETAIL_FIELDS = ('name', 'age', 'location', 'education_level')
+
+# Rows per INSERT/SELECT statement, kept under SQLite's bound parameter limit
+BULK_CHUNK_SIZE = 500
+
+
+def load_student_profiles(student_ids):
+    """
+    Load the assessment columns of many students as StudentProfiles, keyed
+    by id. Missing ids are left out of the result.
+    """
+    columns = [Student.id] + [getattr(Student, field) for field in ASSESSMENT_FIELDS]
+    student_ids = list(student_ids)
+    profiles = {}
+    for start in range(0, len(student_ids), BULK_CHUNK_SIZE):
+        chunk = student_ids[start:start + BULK_CHUNK_SIZE]
+        rows = db.session.execute(select(*columns).where(Student.id.in_(chunk))).all()
+        if rows:
+            # Answers go straight from the row tuples into one array
+            answers = [row[1:] for row in rows]
+            profiles.update(zip((row[0] for row in rows), StudentProfile.from_rows(answers)))
+    return profiles
+
+
+def bulk_create_students(profiles):
+    """
+    Insert Student rows for profile dicts in grouped statements and
+    return the new ids in input order
+    """
+    rows = [
+        {field: profile[field] for field in STUDENT_DETAIL_FIELDS + ASSESSMENT_FIELDS}
+        for profile in profiles
+    ]
+    for row, profile in zip(rows, profiles):
+        row['preferred_language'] = profile.get('preferred_language', 'en')
+
+    student_ids = []
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        student_ids.extend(db.session.scalars(
+            insert(Student).returning(Student.id, sort_by_parameter_order=True),
+            rows[start:start + BULK_CHUNK_SIZE]
+        ).all())
+    return student_ids
+
+
+def _upsert_statement():
+    """
+    INSERT ... ON CONFLICT (student_id, career_id) DO UPDATE for dialects that
+    support it, None otherwise
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        stmt = sqlite.insert(CareerRecommendation.__table__)
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(CareerRecommendation.__table__)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=['student_id', 'career_id'],
+        set_={'match_score': stmt.excluded.match_score}
+    )
+
+
+# Queued recommendation rows are upserted too: a repeat view before the
+# queue flushes scores and submits the same rows again
+def _queued_recommendation_statement():
+    stmt = _upsert_statement()
+    return stmt if stmt is not None else insert(CareerRecommendation)
+
+
+write_queue.register_statement(CareerRecommendation, _queued_recommendation_statement)
+
+
+def delete_recommendations(student_ids):
+    """
+    Remove the stored result sets of the given students
+    """
+    student_ids = list(student_ids)
+    for start in range(0, len(student_ids), BULK_CHUNK_SIZE):
+        chunk = student_ids[start:start + BULK_CHUNK_SIZE]
+        db.session.execute(delete(CareerRecommendation).where(CareerRecommendation.student_id.in_(chunk)))
+
+
+def bulk_save_recommendations(student_ids, batch_recommendations, replace=False):
+    """
+    Store CareerRecommendation rows for many students in grouped statements.
+    batch_recommendations is aligned with student_ids, as returned by
+    CareerRecommendationEngine.get_batch_recommendations.
+    Rows are upserted on (student_id, career_id); with replace=True the
+    students' previous result sets are deleted first, for re-scoring.
+    """
+    rows = [
+        {
+            'student_id': student_id,
+            'career_id': rec['career'].id,
+            'match_score': rec['match_score']
+        }
+        for student_id, recommendations in zip(student_ids, batch_recommendations)
+        for rec in recommendations
+    ]
+    return bulk_save_recommendation_rows(student_ids, rows, replace)
+
+
+def bulk_save_recommendation_rows(student_ids, rows, replace=False):
+    """
+    Store prepared {'student_id', 'career_id', 'match_score'} rows for the
+    given students, as bulk_save_recommendations does
+    """
+    if replace:
+        delete_recommendations(student_ids)
+    
+    stmt = None if replace else _upsert_statement()
+    if stmt is None:
+        if not replace:
+            # No native upsert on this dialect: replace the result sets instead
+            delete_recommendations(student_ids)
+        stmt = insert(CareerRecommendation)
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        db.session.execute(stmt, rows[start:start + BULK_CHUNK_SIZE])
+    logger.info(f"Saved {len(rows)} recommendations for {len(student_ids)} students")
+    return len(rows)
+
+
+def save_recommendations(student_id, recommendations):
+    """
+    Store one student's result set idempotently, through the write-behind
+    queue when it is enabled
+    """
+    if write_queue.enabled:
+        for rec in recommendations:
+            write_queue.submit(CareerRecommendation, {
+                'student_id': student_id,
+                'career_id': rec['career'].id,
+                'match_score': rec['match_score']
+            })
+        return len(recommendations)
+    return bulk_save_recommendations([student_id], [recommendations])
+
+
+def stored_recommendations_statement(student_id):
+    return (
+        select(CareerRecommendation.career_id, CareerRecommendation.match_score)
+        .where(CareerRecommendation.student_id == student_id)
+        .order_by(CareerRecommendation.match_score.desc(), CareerRecommendation.career_id)
+    )
+
+
+def stored_recommendations(student_id, top_k=10):
+    """
+    Read a student's stored result set in the engine's output format, best
+    first, or an empty list if the student has not been scored yet.
+    Careers come from the cached catalogue, so this is a single query.
+    """
+    from catalog_cache import career_catalog  # Deferred import
+    rows = db.session.execute(stored_recommendations_statement(student_id)).all()
+    return recommendations_from_rows(rows, career_catalog.get_matrix(), top_k)
+
+
+def recommendations_from_rows(rows, career_matrix, top_k=10):
+    """
+    Engine-format recommendations from (career_id, match_score) rows,
+    skipping careers no longer in the catalogue
+    """
+    recommendations = []
+    for row in rows:
+        position = career_matrix.index_of(row.career_id)
+        if position is None:
+            continue  # Career removed from the catalogue since scoring
+        recommendations.append({
+            'career': career_matrix.careers[position],
+            'match_score': row.match_score,
+            'match_percentage': int(row.match_score * 100)
+        })
+        if len(recommendations) == top_k:
+            break
+    return recommendations
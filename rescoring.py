@@ -0,0 +1,278 @@
+"""
+Re-score every stored student against the current career catalogue.
+
+    python rescoring.py                          # all students, one worker per core
+    python rescoring.py --workers 8 --chunk-size 5000
+    python rescoring.py --restart                # ignore an existing checkpoint
+
+Students are read in id order in chunks and scored in a process pool. The
+career matrix is placed in shared memory once and mapped by every worker,
+not pickled per task. Results are written in chunk order with bulk
+statements, one transaction per chunk, and a checkpoint records the last
+written student. An interrupted run resumes from the checkpoint unless the
+catalogue has changed since, in which case it starts over.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from sqlalchemy import func, select
+from app import app, db
+from models import Student
+from ml_model import CareerMatrix, CareerRecommendationEngine, top_k_indices
+from profiles import answer_matrix, ASSESSMENT_FIELDS, INTEREST_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress log lines
+PROGRESS_INTERVAL = 5.0
+
+# Set in each worker by _init_worker
+_worker_matrix = None
+_worker_memory = None
+
+
+def catalog_digest(career_matrix):
+    """
+    Digest of the career ids and weights, to tell whether a checkpoint was
+    written against the same catalogue
+    """
+    digest = hashlib.sha1()
+    for name in ('ids', 'skills', 'interests', 'personality', 'rural'):
+        digest.update(np.ascontiguousarray(getattr(career_matrix, name)).tobytes())
+    return digest.hexdigest()
+
+
+def share_matrix(career_matrix):
+    """
+    Copy the matrix's scoring arrays into one shared memory block. Returns
+    the block and the (offset, shape, dtype) layout workers map it with.
+    """
+    arrays = {name: np.ascontiguousarray(getattr(career_matrix, name)) for name in CareerMatrix.ARRAY_FIELDS}
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // 8) * 8  # 8-byte alignment for every array
+        layout[name] = (offset, array.shape, array.dtype.str)
+        offset += array.nbytes
+    memory = SharedMemory(create=True, size=max(offset, 1))
+    for name, array in arrays.items():
+        start, shape, dtype = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=start)[...] = array
+    return memory, layout
+
+
+def _attach(name):
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with the resource tracker;
+        # pool workers share the parent's tracker, so it is still unlinked only once
+        return SharedMemory(name=name)
+
+
+def mapped_matrix(memory, layout):
+    """
+    CareerMatrix whose arrays are read-only views of the shared block
+    """
+    arrays = {}
+    for name, (offset, shape, dtype) in layout.items():
+        array = np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[name] = array
+    return CareerMatrix.from_arrays(arrays)
+
+
+def _init_worker(memory_name, layout):
+    global _worker_matrix, _worker_memory
+    _worker_memory = _attach(memory_name)
+    _worker_matrix = mapped_matrix(_worker_memory, layout)
+
+
+def score_chunk(student_ids, answers, top_k, career_matrix=None):
+    """
+    Top career ids and scores for one chunk of students, as
+    (student_ids, career_ids, scores) with one row per student
+    """
+    career_matrix = career_matrix if career_matrix is not None else _worker_matrix
+    engine = CareerRecommendationEngine()
+    # Raw answers scaled as profile_matrix does
+    profiles = answers / 5.0
+    k = min(top_k, len(career_matrix))
+    career_ids = np.empty((len(profiles), k), dtype=np.int64)
+    scores = np.empty((len(profiles), k))
+    # Bound the students x careers x fields intermediates as get_batch_recommendations does
+    batch = max(1, engine.BATCH_CELLS // (max(len(career_matrix), 1) * len(INTEREST_FIELDS)))
+    for start in range(0, len(profiles), batch):
+        block = engine.calculate_match_score_matrix(profiles[start:start + batch], career_matrix)
+        for i, row_scores in enumerate(block, start=start):
+            best = top_k_indices(row_scores, k)
+            career_ids[i] = career_matrix.ids[best]
+            scores[i] = row_scores[best]
+    return student_ids, career_ids, scores
+
+
+class Checkpoint:
+    """
+    Last written student id of a run, stored as JSON and replaced atomically
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _student_chunks(after_id, chunk_size):
+    """
+    (student_ids, answers) chunks in id order, starting after after_id
+    """
+    columns = [Student.id] + [getattr(Student, field) for field in ASSESSMENT_FIELDS]
+    while True:
+        rows = db.session.execute(
+            select(*columns).where(Student.id > after_id).order_by(Student.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        student_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        answers = answer_matrix(rows)
+        yield student_ids, answers
+        after_id = int(student_ids[-1])
+
+
+def _write_chunk(student_ids, career_ids, scores):
+    from recommendation_store import bulk_save_recommendation_rows  # Deferred import
+    rows = [
+        {'student_id': int(student_id), 'career_id': int(career_id), 'match_score': float(score)}
+        for student_id, student_careers, student_scores in zip(student_ids, career_ids, scores)
+        for career_id, score in zip(student_careers, student_scores)
+    ]
+    bulk_save_recommendation_rows(student_ids.tolist(), rows, replace=True)
+    db.session.commit()
+    return len(rows)
+
+
+def rescore_students(workers=None, chunk_size=2000, top_k=8, checkpoint_path=None, restart=False):
+    """
+    Re-score all students and replace their stored result sets. Returns a
+    summary dict. Must run inside an app context.
+    """
+    from catalog_cache import career_catalog  # Deferred import
+    workers = os.cpu_count() if workers is None else workers
+    checkpoint = Checkpoint(checkpoint_path or os.path.join(app.instance_path, 'rescoring-checkpoint.json'))
+    career_matrix = career_catalog.get_matrix()
+    digest = catalog_digest(career_matrix)
+
+    state = None if restart else checkpoint.load()
+    if state is not None and (state.get('catalog_digest') != digest or state.get('top_k') != top_k):
+        logger.warning("Checkpoint was written for another catalogue or top_k, starting over")
+        state = None
+    if state is None:
+        state = {'catalog_digest': digest, 'top_k': top_k, 'last_student_id': 0,
+                 'students_done': 0, 'started_at': time.time()}
+    else:
+        logger.info(f"Resuming after student {state['last_student_id']} "
+                    f"({state['students_done']} students already done)")
+
+    remaining = db.session.scalar(select(func.count(Student.id)).where(Student.id > state['last_student_id']))
+    total = state['students_done'] + remaining
+    started = time.perf_counter()
+    done_this_run = recommendations = 0
+    logged_at = started
+
+    def record(result):
+        nonlocal done_this_run, recommendations, logged_at
+        student_ids = result[0]
+        recommendations += _write_chunk(*result)
+        done_this_run += len(student_ids)
+        state['students_done'] += len(student_ids)
+        state['last_student_id'] = int(student_ids[-1])
+        checkpoint.save(state)
+        now = time.perf_counter()
+        if now - logged_at >= PROGRESS_INTERVAL or state['students_done'] == total:
+            logged_at = now
+            rate = done_this_run / (now - started)
+            eta = (total - state['students_done']) / rate if rate else 0.0
+            logger.info(f"Re-scored {state['students_done']}/{total} students "
+                        f"({rate:.0f}/s, about {eta:.0f}s left)")
+
+    chunks = _student_chunks(state['last_student_id'], chunk_size)
+    if workers <= 0:
+        for student_ids, answers in chunks:
+            record(score_chunk(student_ids, answers, top_k, career_matrix))
+    else:
+        memory, layout = share_matrix(career_matrix)
+        logger.info(f"Shared {len(career_matrix)} careers ({memory.size / 2 ** 20:.1f} MB) with {workers} workers")
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                     initializer=_init_worker, initargs=(memory.name, layout)) as pool:
+                # Up to two chunks per worker in flight; results are written in submission
+                # order so the checkpoint always marks a fully written prefix
+                pending = deque()
+                for student_ids, answers in chunks:
+                    pending.append(pool.submit(score_chunk, student_ids, answers, top_k))
+                    if len(pending) >= 2 * workers:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+        finally:
+            memory.close()
+            memory.unlink()
+
+    checkpoint.remove()
+    elapsed = time.perf_counter() - started
+    summary = {
+        'students': state['students_done'],
+        'students_this_run': done_this_run,
+        'recommendations_written': recommendations,
+        'careers': len(career_matrix),
+        'workers': workers,
+        'seconds': round(elapsed, 2),
+        'students_per_second': round(done_this_run / elapsed, 1) if elapsed else None,
+    }
+    logger.info(f"Re-scoring finished: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-score all students against the current catalogue')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Scoring processes (default: CPU count; 0 scores in this process)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='Students per task and per transaction')
+    parser.add_argument('--top-k', type=int, default=8, help='Careers stored per student')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: instance/rescoring-checkpoint.json)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        summary = rescore_students(args.workers, args.chunk_size, args.top_k, args.checkpoint, args.restart)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,8 @@
-from flask import render_template, request, redirect, url_for, flash, session, jsonify
+from flask import render_template, request, redirect, url_for, flash, session, jsonify, abort, stream_with_context
 from app import app, db
 from forms import StudentAssessmentForm
 from translations import get_translations
+from instrumentation import instrumentation
 import logging
 
 # Configure logging
@@ -17,6 +18,8 @@ def index():
 @app.route('/assessment', methods=['GET', 'POST'])
 def assessment():
     from models import Student  # Deferred import
+    from profiles import StudentProfile  # Deferred import
+    from write_behind import write_queue  # Deferred import
     form = StudentAssessmentForm()
     language = session.get('language', 'en')
     translations = get_translations(language)
@@ -24,35 +27,26 @@ def assessment():
     if form.validate_on_submit():
         try:
             # Create new student record
-            student = Student(
+            student_values = dict(
                 name=form.name.data,
                 age=form.age.data,
                 location=form.location.data,
                 education_level=form.education_level.data,
                 preferred_language=form.preferred_language.data,
-                technical_skills=form.technical_skills.data,
-                communication_skills=form.communication_skills.data,
-                analytical_skills=form.analytical_skills.data,
-                creative_skills=form.creative_skills.data,
-                leadership_skills=form.leadership_skills.data,
-                interest_technology=form.interest_technology.data,
-                interest_arts=form.interest_arts.data,
-                interest_business=form.interest_business.data,
-                interest_healthcare=form.interest_healthcare.data,
-                interest_education=form.interest_education.data,
-                interest_agriculture=form.interest_agriculture.data,
-                interest_government=form.interest_government.data,
-                extroversion=form.extroversion.data,
-                conscientiousness=form.conscientiousness.data,
-                openness=form.openness.data,
-                agreeableness=form.agreeableness.data
+                **StudentProfile.from_form(form).to_dict()
             )
             
-            db.session.add(student)
-            db.session.commit()
+            if write_queue.enabled:
+                # Grouped with concurrent submissions into one transaction
+                student_id = write_queue.submit(Student, student_values, wait=True)
+            else:
+                student = Student(**student_values)
+                db.session.add(student)
+                db.session.commit()
+                student_id = student.id
             
             # Store student ID in session for results
-            session['student_id'] = student.id
+            session['student_id'] = student_id
             
             # Redirect to results
             return redirect(url_for('results'))
@@ -66,8 +60,10 @@ def assessment():
 
 @app.route('/results')
 def results():
-    from models import Student, Career, Course, Scholarship, CareerRecommendation  # Deferred import
+    from models import Student  # Deferred import
     from ml_model import CareerRecommendationEngine  # Deferred import
+    from recommendation_store import stored_recommendations, save_recommendations  # Deferred import
+    from catalog_cache import course_catalog, scholarship_catalog  # Deferred import
     ml_engine = CareerRecommendationEngine()  # Initialize inside function
     student_id = session.get('student_id')
     if not student_id:
@@ -83,36 +79,31 @@ def results():
             flash('Student record not found.', 'error')
             return redirect(url_for('assessment'))
         
-        # Get career recommendations
-        recommendations = ml_engine.get_career_recommendations(student, top_k=8)
-        
-        # Save recommendations to database
-        for rec in recommendations:
-            career_rec = CareerRecommendation(
-                student_id=student.id,
-                career_id=rec['career'].id,
-                match_score=rec['match_score']
-            )
-            db.session.add(career_rec)
-        
-        db.session.commit()
+        # Recommendations are scored and stored once per assessment; later views read them back
+        recommendations = stored_recommendations(student.id, top_k=8)
+        if not recommendations:
+            with instrumentation.span('ml'):
+                recommendations = ml_engine.get_career_recommendations(student, top_k=8)
+            save_recommendations(student.id, recommendations)
+            db.session.commit()
         
-        # Get courses for top recommendations
+        # Courses for the top recommendations come from the cached course index, no query
         top_career_ids = [rec['career'].id for rec in recommendations[:5]]
-        courses = Course.query.filter(Course.career_id.in_(top_career_ids)).all()
+        courses = course_catalog.for_careers(top_career_ids)
         
-        # Get scholarships (prioritize rural-friendly ones)
-        scholarships = Scholarship.query.filter_by(for_rural_students=True).limit(6).all()
-        if len(scholarships) < 6:
-            additional_scholarships = Scholarship.query.filter_by(for_rural_students=False).limit(6 - len(scholarships)).all()
-            scholarships.extend(additional_scholarships)
+        # Scholarships (rural-friendly first) come from the cached shortlist, no query
+        scholarships = scholarship_catalog.shortlist(6)
         
         return render_template('results.html', 
                              student=student,
                              recommendations=recommendations,
                              courses=courses,
                              scholarships=scholarships,
-                             translations=translations)
+                             translations=translations,
+                             current_language=language,
+                             # Fragment cache keys, see fragment_cache.py
+                             career_scores=[(rec['career'].id, rec['match_percentage']) for rec in recommendations],
+                             course_career_ids=top_career_ids)
         
     except Exception as e:
         logger.error(f"Error generating results: {str(e)}")
@@ -121,56 +112,252 @@ def results():
 
 @app.route('/career/<int:career_id>')
 def career_details(career_id):
-    from models import Student, Career, Course  # Deferred import
+    from models import Student  # Deferred import
     from ml_model import CareerRecommendationEngine  # Deferred import
+    from catalog_cache import career_catalog, course_catalog  # Deferred import
     ml_engine = CareerRecommendationEngine()  # Initialize inside function
     language = session.get('language', 'en')
     translations = get_translations(language)
     student_id = session.get('student_id')
     
-    career = Career.query.get_or_404(career_id)
-    courses = Course.query.filter_by(career_id=career_id).all()
+    # Career row comes from the cached catalogue, no query
+    career = career_catalog.get_career(career_id)
+    if career is None:
+        abort(404)
+    courses = course_catalog.for_career(career_id)
     
     explanation = []
     match_score = 0
+    sub_scores = None
     
     if student_id:
         student = Student.query.get(student_id)
         if student:
-            explanation = ml_engine.get_explanation(student, career)
-            match_score = int(ml_engine.calculate_match_score(student, career) * 100)
+            # Score, sub-scores and reasons in one pass, memoized per (answers, career)
+            with instrumentation.span('ml'):
+                details = ml_engine.score_and_explain(student, career_id)
+            if details is not None:
+                explanation = details['reasons']
+                match_score = details['match_percentage']
+                sub_scores = details
     
     return render_template('career_details.html',
                          career=career,
                          courses=courses,
                          explanation=explanation,
                          match_score=match_score,
-                         translations=translations)
+                         sub_scores=sub_scores,
+                         translations=translations,
+                         current_language=language)
+
+CHART_COLORS = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40']
+
+def chart_data(recommendations):
+    """Doughnut chart payload for up to six recommendations, shared with asgi.py"""
+    return {
+        'labels': [rec['career'].name for rec in recommendations],
+        'data': [rec['match_percentage'] for rec in recommendations],
+        'colors': CHART_COLORS
+    }
 
 @app.route('/api/career-chart-data/<int:student_id>')
 def career_chart_data(student_id):
     from models import Student  # Deferred import
     from ml_model import CareerRecommendationEngine  # Deferred import
+    from recommendation_store import stored_recommendations  # Deferred import
     ml_engine = CareerRecommendationEngine()  # Initialize inside function
     try:
         student = Student.query.get(student_id)
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         
-        recommendations = ml_engine.get_career_recommendations(student, top_k=6)
+        # Chart the stored result set when there is one so it matches /results
+        recommendations = stored_recommendations(student.id, top_k=6)
+        if not recommendations:
+            with instrumentation.span('ml'):
+                recommendations = ml_engine.get_career_recommendations(student, top_k=6)
         
-        chart_data = {
-            'labels': [rec['career'].name for rec in recommendations],
-            'data': [rec['match_percentage'] for rec in recommendations],
-            'colors': ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF', '#FF9F40']
-        }
-        
-        return jsonify(chart_data)
+        return jsonify(chart_data(recommendations))
         
     except Exception as e:
         logger.error(f"Error generating chart data: {str(e)}")
         return jsonify({'error': 'Failed to generate chart data'}), 500
 
+@app.route('/api/cache-stats')
+def cache_stats():
+    from catalog_cache import recommendation_cache, explanation_cache  # Deferred import
+    from fragment_cache import fragment_cache  # Deferred import
+    return jsonify({
+        'recommendations': recommendation_cache.stats(),
+        'explanations': explanation_cache.stats(),
+        'fragments': fragment_cache.stats()
+    })
+
+@app.route('/metrics')
+def metrics():
+    from catalog_cache import recommendation_cache, explanation_cache  # Deferred import
+    from fragment_cache import fragment_cache  # Deferred import
+    from write_behind import write_queue  # Deferred import
+    if not instrumentation.enabled:
+        abort(404)
+    cache = recommendation_cache.stats()
+    explanations = explanation_cache.stats()
+    samples = [
+        ('recommendation_cache_hits_total', 'counter', 'Recommendation cache hits.', cache['hits']),
+        ('recommendation_cache_misses_total', 'counter', 'Recommendation cache misses.', cache['misses']),
+        ('recommendation_cache_entries', 'gauge', 'Entries in the recommendation cache.', cache['size']),
+        ('explanation_cache_hits_total', 'counter', 'Explanation cache hits.', explanations['hits']),
+        ('explanation_cache_misses_total', 'counter', 'Explanation cache misses.', explanations['misses']),
+    ]
+    fragments = fragment_cache.stats()
+    if fragments['enabled']:
+        samples.extend([
+            ('fragment_cache_hits_total', 'counter', 'Rendered fragment cache hits.', fragments['hits']),
+            ('fragment_cache_misses_total', 'counter', 'Rendered fragment cache misses.', fragments['misses']),
+            ('fragment_cache_entries', 'gauge', 'Rendered fragments held in memory.', fragments['size']),
+        ])
+    samples += [
+        ('write_behind_queue_depth', 'gauge', 'Rows waiting in the write-behind queue.', write_queue.depth()),
+    ]
+    return app.response_class(instrumentation.render_metrics(samples),
+                              mimetype='text/plain; version=0.0.4')
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    from profiler import request_profiler  # Deferred import
+    if not request_profiler.authorized():
+        abort(404)
+    return jsonify({'profiles': request_profiler.profiles()})
+
+@app.route('/admin/profiles/<int:profile_id>')
+def admin_profile(profile_id):
+    from profiler import request_profiler  # Deferred import
+    if not request_profiler.authorized():
+        abort(404)
+    profile = request_profiler.get_profile(profile_id)
+    if profile is None:
+        abort(404)
+    return app.response_class(profile.collapsed, mimetype='text/plain')
+
+@app.route('/api/export/<table>')
+def export_data(table):
+    import hmac  # Deferred import
+    from export import ExportError, CONTENT_TYPES, export_rows, export_filename, parse_export_date  # Deferred import
+    token = app.config['EXPORT_TOKEN']
+    supplied = request.headers.get('Authorization', '')
+    if not token or not hmac.compare_digest(supplied, f"Bearer {token}"):
+        abort(404)
+    
+    export_format = request.args.get('format', 'csv')
+    compress = request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+    try:
+        chunks = export_rows(
+            table, export_format, compress,
+            since=parse_export_date(request.args.get('since')),
+            until=parse_export_date(request.args.get('until')),
+            career_id=request.args.get('career_id', type=int)
+        )
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Rows are read and sent chunk by chunk while the response streams
+    response = app.response_class(
+        stream_with_context(chunks),
+        mimetype='application/gzip' if compress else CONTENT_TYPES[export_format]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(table, export_format, compress)}"'
+    return response
+
+@app.route('/api/batch-recommendations', methods=['POST'])
+def batch_recommendations():
+    import hmac  # Deferred import
+    from ml_model import CareerRecommendationEngine  # Deferred import
+    from profiles import StudentProfile, ASSESSMENT_FIELDS  # Deferred import
+    from recommendation_store import (STUDENT_DETAIL_FIELDS, load_student_profiles,
+                                      bulk_create_students, bulk_save_recommendations)  # Deferred import
+    # Creates students and replaces stored results, so it is gated like /api/export
+    token = app.config['BATCH_API_TOKEN']
+    supplied = request.headers.get('Authorization', '')
+    if not token or not hmac.compare_digest(supplied, f"Bearer {token}"):
+        abort(404)
+    
+    ml_engine = CareerRecommendationEngine()
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    
+    student_ids = payload.get('student_ids', [])
+    profiles = payload.get('students', [])
+    top_k = payload.get('top_k', 8)
+    save = payload.get('save', True)
+    
+    if not isinstance(student_ids, list) or not all(
+            isinstance(i, int) and not isinstance(i, bool) for i in student_ids):
+        return jsonify({'error': 'student_ids must be a list of integers'}), 400
+    if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+        return jsonify({'error': 'students must be a list of objects'}), 400
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or not 1 <= top_k <= app.config['BATCH_MAX_TOP_K']:
+        return jsonify({'error': f"top_k must be an integer from 1 to {app.config['BATCH_MAX_TOP_K']}"}), 400
+    # A repeated id would be stored twice after its old results are deleted
+    student_ids = list(dict.fromkeys(student_ids))
+    if len(student_ids) + len(profiles) > app.config['BATCH_MAX_STUDENTS']:
+        return jsonify({'error': f"At most {app.config['BATCH_MAX_STUDENTS']} students per batch"}), 400
+    
+    for index, profile in enumerate(profiles):
+        for field in ASSESSMENT_FIELDS:
+            value = profile.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 5:
+                return jsonify({'error': f"students[{index}].{field} must be a number from 0 to 5"}), 400
+    
+    try:
+        stored_profiles = load_student_profiles(student_ids)
+        found_ids = [student_id for student_id in student_ids if student_id in stored_profiles]
+        missing_ids = [student_id for student_id in student_ids if student_id not in stored_profiles]
+        
+        # New students are only created for profiles that carry the basic details
+        creatable = [save and all(p.get(field) for field in STUDENT_DETAIL_FIELDS) for p in profiles]
+        new_ids = iter(bulk_create_students([p for p, create in zip(profiles, creatable) if create]))
+        profile_ids = [next(new_ids) if create else None for create in creatable]
+        
+        with instrumentation.span('ml'):
+            batch = ml_engine.get_batch_recommendations(
+                [stored_profiles[student_id] for student_id in found_ids]
+                + [StudentProfile.from_dict(profile) for profile in profiles],
+                top_k=top_k
+            )
+        result_ids = found_ids + profile_ids
+        
+        if save:
+            # Students listed by id are re-scored, so their previous result sets are replaced
+            bulk_save_recommendations(found_ids, batch[:len(found_ids)], replace=True)
+            created = [(s, recs) for s, recs in zip(profile_ids, batch[len(found_ids):]) if s is not None]
+            bulk_save_recommendations([s for s, _ in created], [r for _, r in created])
+            db.session.commit()
+        
+        return jsonify({
+            'results': [
+                {
+                    'student_id': student_id,
+                    'recommendations': [
+                        {
+                            'career_id': rec['career'].id,
+                            'career_name': rec['career'].name,
+                            'match_score': rec['match_score'],
+                            'match_percentage': rec['match_percentage']
+                        }
+                        for rec in recommendations
+                    ]
+                }
+                for student_id, recommendations in zip(result_ids, batch)
+            ],
+            'missing_student_ids': missing_ids
+        })
+        
+    except Exception as e:
+        logger.error(f"Error generating batch recommendations: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to generate batch recommendations'}), 500
+
 @app.errorhandler(404)
 def not_found_error(error):
     language = session.get('language', 'en')
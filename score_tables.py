@@ -0,0 +1,91 @@
+import itertools
+import logging
+import numpy as np
+from profiles import SKILL_FIELDS, INTEREST_FIELDS, PERSONALITY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Every assessment answer is an integer on this scale
+ANSWER_VALUES = np.arange(1, 6)
+
+_SKILL_ROWS = len(SKILL_FIELDS) * len(ANSWER_VALUES)
+_INTEREST_ROWS = len(INTEREST_FIELDS) * len(ANSWER_VALUES)
+_PERSONALITY_ROWS = len(ANSWER_VALUES) ** len(PERSONALITY_FIELDS)
+TABLE_ROWS = _SKILL_ROWS + _INTEREST_ROWS + _PERSONALITY_ROWS
+
+
+class ScoreTables:
+    """
+    Partial match scores of every career for every possible answer, with
+    the block weights and rural boost already applied. Skill and interest
+    terms are sums over fields, so each field gets one row per answer
+    value; the personality cosine does not separate and gets one row per
+    combination of the four answers. Scoring a profile is then 13 row
+    additions and the 1.0 cap.
+    """
+    def __init__(self, career_matrix):
+        values = ANSWER_VALUES / 5.0
+        boost = career_matrix.rural_boost
+        table = np.empty((TABLE_ROWS, len(career_matrix)))
+
+        # Skills: min(student / requirement, 1) * requirement, or 0.1 * student if not required
+        skill_weight = 0.4 / len(SKILL_FIELDS) * boost
+        for field in range(len(SKILL_FIELDS)):
+            required = career_matrix.skills_required[:, field]
+            for i, value in enumerate(values):
+                table[field * len(values) + i] = np.where(
+                    required,
+                    np.minimum(value / career_matrix.skills_divisor[:, field], 1.0) * career_matrix.skills[:, field],
+                    value * 0.1
+                ) * skill_weight
+
+        interest_weight = 0.4 / len(INTEREST_FIELDS) * boost
+        for field in range(len(INTEREST_FIELDS)):
+            for i, value in enumerate(values):
+                table[_SKILL_ROWS + field * len(values) + i] = value * career_matrix.interests[:, field] * interest_weight
+
+        # Answer combinations in base-5 order, matching personality_row()
+        combinations = np.array(list(itertools.product(values, repeat=len(PERSONALITY_FIELDS))))
+        units = combinations / np.sqrt(np.einsum('ij,ij->i', combinations, combinations))[:, None]
+        similarity = units @ career_matrix.personality_unit.T
+        table[_SKILL_ROWS + _INTEREST_ROWS:] = np.where(
+            career_matrix.personality_missing, 0.5, (similarity + 1) / 2
+        ) * (0.2 * boost)
+
+        self.table = table
+        logger.info(f"Built score tables for {len(career_matrix)} careers ({table.nbytes / 2 ** 20:.1f} MB)")
+
+    @staticmethod
+    def table_bytes(career_count):
+        return TABLE_ROWS * career_count * np.dtype(np.float64).itemsize
+
+    @staticmethod
+    def rows_for(answers):
+        """
+        Table rows for one (16,) answer vector, or None if any answer is
+        not an integer from 1 to 5
+        """
+        rounded = np.rint(answers)
+        if not (np.all(np.abs(answers - rounded) < 1e-9) and np.all((rounded >= 1) & (rounded <= 5))):
+            return None
+        offsets = rounded.astype(np.intp) - 1
+        skills = offsets[:len(SKILL_FIELDS)]
+        interests = offsets[len(SKILL_FIELDS):len(SKILL_FIELDS) + len(INTEREST_FIELDS)]
+        personality = offsets[len(SKILL_FIELDS) + len(INTEREST_FIELDS):]
+        size = len(ANSWER_VALUES)
+        rows = list(np.arange(len(SKILL_FIELDS)) * size + skills)
+        rows.extend(_SKILL_ROWS + np.arange(len(INTEREST_FIELDS)) * size + interests)
+        personality_row = 0
+        for offset in personality:
+            personality_row = personality_row * size + offset
+        rows.append(_SKILL_ROWS + _INTEREST_ROWS + personality_row)
+        return rows
+
+    def scores(self, rows):
+        """
+        Match scores of every career for the rows of one profile
+        """
+        total = self.table[rows[0]].copy()
+        for row in rows[1:]:
+            total += self.table[row]
+        return np.minimum(total, 1.0, out=total)
@@ -0,0 +1,283 @@
+"""
+Synthetic data generator for load testing.
+
+    python synthetic_data.py --students 1000000 --careers 20000
+    python synthetic_data.py --database-url postgresql://... --seed 7
+
+Writes careers, courses, scholarships, students and their stored
+recommendations in streaming chunks. The same seed and sizes always
+produce the same rows.
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, func, insert, select
+
+from app import app, db
+from models import Student, Career, Course, Scholarship, CareerRecommendation
+from ml_model import CAREER_SKILL_FIELDS, CAREER_INTEREST_FIELDS, CAREER_PERSONALITY_FIELDS
+from profiles import SKILL_FIELDS, INTEREST_FIELDS, PERSONALITY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Category archetypes: career weight vectors in skill/interest/personality order,
+# and the chance a career in the category has rural opportunities
+CATEGORY_PROFILES = {
+    'Technology': ([0.9, 0.5, 0.8, 0.5, 0.3], [0.9, 0.2, 0.3, 0.1, 0.2, 0.1, 0.2], [0.3, 0.8, 0.9, 0.4], 0.4),
+    'Business': ([0.4, 0.9, 0.7, 0.5, 0.8], [0.4, 0.3, 0.9, 0.1, 0.2, 0.2, 0.3], [0.8, 0.7, 0.7, 0.5], 0.4),
+    'Healthcare': ([0.5, 0.8, 0.7, 0.2, 0.4], [0.2, 0.1, 0.2, 0.9, 0.3, 0.2, 0.4], [0.6, 0.9, 0.6, 0.9], 0.7),
+    'Education': ([0.3, 0.9, 0.6, 0.6, 0.6], [0.2, 0.3, 0.2, 0.2, 0.9, 0.2, 0.4], [0.7, 0.8, 0.8, 0.9], 0.7),
+    'Agriculture': ([0.6, 0.5, 0.6, 0.3, 0.4], [0.4, 0.1, 0.4, 0.1, 0.2, 0.9, 0.4], [0.4, 0.7, 0.6, 0.7], 0.9),
+    'Arts': ([0.4, 0.6, 0.4, 0.9, 0.3], [0.4, 0.9, 0.3, 0.1, 0.3, 0.1, 0.1], [0.5, 0.6, 0.9, 0.5], 0.4),
+    'Government': ([0.3, 0.8, 0.7, 0.3, 0.7], [0.2, 0.1, 0.3, 0.2, 0.4, 0.3, 0.9], [0.6, 0.9, 0.5, 0.7], 0.5),
+}
+CATEGORIES = list(CATEGORY_PROFILES)
+
+FIRST_NAMES = ['Aarav', 'Ananya', 'Arjun', 'Divya', 'Ishaan', 'Kavya', 'Lakshmi', 'Manoj', 'Meera', 'Nikhil',
+               'Priya', 'Rahul', 'Ravi', 'Sanjana', 'Suresh', 'Tanvi', 'Uma', 'Vikram', 'Yamini', 'Zoya']
+LAST_NAMES = ['Reddy', 'Sharma', 'Patel', 'Kumar', 'Das', 'Iyer', 'Naidu', 'Singh', 'Patil', 'Ghosh']
+LOCATIONS = ['Anantapur', 'Bhadrachalam', 'Chitradurga', 'Dharmapuri', 'Gaya', 'Jalna', 'Kurnool', 'Madurai',
+             'Nalgonda', 'Puri', 'Raichur', 'Satara', 'Sitapur', 'Tumkur', 'Warangal', 'Yavatmal']
+EDUCATION_LEVELS = ['10th_grade', '12th_grade', 'diploma', 'graduate', 'postgraduate']
+LANGUAGES = ['en', 'hi', 'te', 'ta', 'bn', 'mr']
+COURSE_PROVIDERS = ['SWAYAM', 'NPTEL', 'Coursera', 'edX', 'Skill India', 'Khan Academy']
+COURSE_LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+SCHOLARSHIP_PROVIDERS = ['Ministry of Education', 'UGC', 'AICTE', 'State Government', 'NSP', 'Private Trust']
+SCHOLARSHIP_AUDIENCES = ['Class 10 students', 'Class 12 students', 'Diploma students',
+                         'Undergraduate students', 'Postgraduate students']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+          'October', 'November', 'December']
+
+
+def _insert_chunks(connection, model, rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        connection.execute(insert(model.__table__), rows[start:start + chunk_size])
+
+
+def _new_ids(connection, model, after_id, count):
+    """
+    Ids assigned to the `count` rows just inserted after `after_id`
+    """
+    return connection.execute(
+        select(model.id).where(model.id > after_id).order_by(model.id).limit(count)
+    ).scalars().all()
+
+
+def _max_id(connection, model):
+    return connection.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+
+
+def generate_careers(connection, rng, count, chunk_size):
+    """
+    Careers drawn around the category archetypes. Returns (ids, categories).
+    """
+    categories = rng.integers(0, len(CATEGORIES), count)
+    skills = np.array([CATEGORY_PROFILES[CATEGORIES[c]][0] for c in categories])
+    interests = np.array([CATEGORY_PROFILES[CATEGORIES[c]][1] for c in categories])
+    personality = np.array([CATEGORY_PROFILES[CATEGORIES[c]][2] for c in categories])
+    rural_rate = np.array([CATEGORY_PROFILES[CATEGORIES[c]][3] for c in categories])
+
+    skills = np.clip(skills + rng.normal(0, 0.12, skills.shape), 0, 1).round(1)
+    skills[rng.random(skills.shape) < 0.1] = 0.0
+    interests = np.clip(interests + rng.normal(0, 0.12, interests.shape), 0, 1).round(1)
+    personality = np.clip(personality + rng.normal(0, 0.12, personality.shape), 0.1, 1).round(1)
+    rural = rng.random(count) < rural_rate
+    salary_low = rng.integers(2, 8, count)
+
+    rows = []
+    for i in range(count):
+        category = CATEGORIES[categories[i]]
+        rows.append({
+            'name': f'{category} Specialist {i + 1}',
+            'description': f'Synthetic {category.lower()} career generated for load testing.',
+            'category': category,
+            **dict(zip(CAREER_SKILL_FIELDS, skills[i].tolist())),
+            **dict(zip(CAREER_INTEREST_FIELDS, interests[i].tolist())),
+            **dict(zip(CAREER_PERSONALITY_FIELDS, personality[i].tolist())),
+            'average_salary': f'₹{salary_low[i]}-{salary_low[i] * 2} LPA',
+            'job_growth': ['Moderate (10%+ annually)', 'High (15%+ annually)', 'Very High (25%+ annually)'][i % 3],
+            'education_required': EDUCATION_LEVELS[i % len(EDUCATION_LEVELS)].replace('_', ' ').title(),
+            'rural_opportunities': bool(rural[i]),
+        })
+    after_id = _max_id(connection, Career)
+    _insert_chunks(connection, Career, rows, chunk_size)
+    return np.array(_new_ids(connection, Career, after_id, count)), categories
+
+
+def generate_courses(connection, rng, career_ids, per_career, chunk_size):
+    levels = rng.integers(0, len(COURSE_LEVELS), len(career_ids) * per_career)
+    providers = rng.integers(0, len(COURSE_PROVIDERS), len(career_ids) * per_career)
+    free = rng.random(len(career_ids) * per_career) < 0.7
+    weeks = rng.integers(2, 25, len(career_ids) * per_career)
+    rows = []
+    for i, career_id in enumerate(np.repeat(career_ids, per_career).tolist()):
+        rows.append({
+            'title': f'Course {i + 1} for career {career_id}',
+            'provider': COURSE_PROVIDERS[providers[i]],
+            'url': f'https://example.org/courses/{career_id}/{i + 1}',
+            'description': 'Synthetic course generated for load testing.',
+            'duration': f'{weeks[i]} weeks',
+            'level': COURSE_LEVELS[levels[i]],
+            'is_free': bool(free[i]),
+            'career_id': career_id,
+        })
+    _insert_chunks(connection, Course, rows, chunk_size)
+    return len(rows)
+
+
+def generate_scholarships(connection, rng, count, chunk_size):
+    rows = []
+    for i in range(count):
+        audience = SCHOLARSHIP_AUDIENCES[rng.integers(0, len(SCHOLARSHIP_AUDIENCES))]
+        rows.append({
+            'name': f'Synthetic Scholarship {i + 1}',
+            'provider': SCHOLARSHIP_PROVIDERS[rng.integers(0, len(SCHOLARSHIP_PROVIDERS))],
+            'description': f'Financial support for {audience.lower()}.',
+            'amount': f'₹{int(rng.integers(5, 100)) * 1000:,} per year',
+            'eligibility': f'{audience} with family income < ₹{int(rng.integers(2, 9))} LPA',
+            'application_url': f'https://example.org/scholarships/{i + 1}',
+            'deadline': f'{MONTHS[rng.integers(0, 12)]} {int(rng.integers(1, 29))}th (Annual)',
+            'for_rural_students': bool(rng.random() < 0.6),
+        })
+    _insert_chunks(connection, Scholarship, rows, chunk_size)
+    return len(rows)
+
+
+def generate_students(connection, rng, count, career_ids, career_categories, per_student, days, until, chunk_size):
+    """
+    Students whose answers lean towards a latent category, each with
+    `per_student` stored recommendations from that category's careers
+    """
+    pools = [career_ids[career_categories == c] for c in range(len(CATEGORIES))]
+    prototypes = np.array([
+        CATEGORY_PROFILES[category][0] + CATEGORY_PROFILES[category][1] + CATEGORY_PROFILES[category][2]
+        for category in CATEGORIES
+    ])
+    fields = SKILL_FIELDS + INTEREST_FIELDS + PERSONALITY_FIELDS
+    students_written = recommendations_written = 0
+
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        latent = rng.integers(0, len(CATEGORIES), size)
+        answers = np.clip(np.rint(1 + 4 * prototypes[latent] + rng.normal(0, 0.9, (size, len(fields)))), 1, 5)
+        ages = rng.integers(16, 31, size)
+        first = rng.integers(0, len(FIRST_NAMES), size)
+        last = rng.integers(0, len(LAST_NAMES), size)
+        locations = rng.integers(0, len(LOCATIONS), size)
+        education = rng.integers(0, len(EDUCATION_LEVELS), size)
+        languages = rng.integers(0, len(LANGUAGES), size)
+        offsets = rng.uniform(0, days * 86400, size)
+
+        rows = [
+            {
+                'name': f'{FIRST_NAMES[first[i]]} {LAST_NAMES[last[i]]}',
+                'age': int(ages[i]),
+                'location': LOCATIONS[locations[i]],
+                'education_level': EDUCATION_LEVELS[education[i]],
+                'preferred_language': LANGUAGES[languages[i]],
+                **dict(zip(fields, answers[i].tolist())),
+                'created_at': until - timedelta(seconds=float(offsets[i])),
+            }
+            for i in range(size)
+        ]
+        after_id = _max_id(connection, Student)
+        connection.execute(insert(Student.__table__), rows)
+        student_ids = _new_ids(connection, Student, after_id, size)
+
+        recommendation_rows = []
+        for student_id, category, created_at in zip(student_ids, latent, (row['created_at'] for row in rows)):
+            pool = pools[category] if len(pools[category]) >= per_student else career_ids
+            picks = rng.choice(pool, min(per_student, len(pool)), replace=False)
+            scores = np.sort(rng.uniform(0.35, 0.95, len(picks)))[::-1]
+            recommendation_rows.extend(
+                {'student_id': student_id, 'career_id': int(career_id), 'match_score': float(score),
+                 'created_at': created_at}
+                for career_id, score in zip(picks, scores)
+            )
+        if recommendation_rows:
+            connection.execute(insert(CareerRecommendation.__table__), recommendation_rows)
+
+        connection.commit()
+        students_written += size
+        recommendations_written += len(recommendation_rows)
+        logger.info(f"Students {students_written}/{count}, recommendations {recommendations_written}")
+
+    return students_written, recommendations_written
+
+
+def generate(database_url, students, careers, courses_per_career=3, scholarships=200,
+             recommendations_per_student=8, days=365, until=None, seed=42, chunk_size=5000):
+    """
+    Populate the database at database_url (default: the app's database) with
+    synthetic rows and return row counts.
+    Submission times fall in the `days` before `until` (default: now); pass
+    `until` as well as `seed` to reproduce a dataset exactly.
+    """
+    from catalog_cache import bump_shared_revisions  # Deferred import
+    if database_url is None:
+        # The resolved URL: Flask-SQLAlchemy puts relative SQLite paths under instance/
+        with app.app_context():
+            database_url = db.engine.url
+    rng = np.random.default_rng(seed)
+    engine = create_engine(database_url)
+    db.metadata.create_all(engine)
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        career_ids, career_categories = generate_careers(connection, rng, careers, chunk_size)
+        course_count = generate_courses(connection, rng, career_ids, courses_per_career, chunk_size)
+        scholarship_count = generate_scholarships(connection, rng, scholarships, chunk_size)
+        # These rows bypass the session hooks, so tell running processes to reload the catalogue
+        bump_shared_revisions(connection, (Career, Course, Scholarship))
+        connection.commit()
+        logger.info(f"Catalogue: {len(career_ids)} careers, {course_count} courses, {scholarship_count} scholarships")
+
+        student_count, recommendation_count = generate_students(
+            connection, rng, students, career_ids, career_categories,
+            recommendations_per_student, days, until or datetime.utcnow(), chunk_size
+        )
+    engine.dispose()
+    counts = {
+        'careers': len(career_ids),
+        'courses': course_count,
+        'scholarships': scholarship_count,
+        'students': student_count,
+        'recommendations': recommendation_count,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"Generated {counts}")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic data for load testing')
+    parser.add_argument('--database-url',
+                        help='Target database (default: the app database, as Flask resolves DATABASE_URL)')
+    parser.add_argument('--students', type=int, default=1_000_000)
+    parser.add_argument('--careers', type=int, default=20_000)
+    parser.add_argument('--courses-per-career', type=int, default=3)
+    parser.add_argument('--scholarships', type=int, default=200)
+    parser.add_argument('--recommendations-per-student', type=int, default=8)
+    parser.add_argument('--days', type=int, default=365, help='Spread submissions over this many past days')
+    parser.add_argument('--until', type=datetime.fromisoformat,
+                        help='Latest submission time, ISO format (default: now)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.INFO)
+    generate(
+        args.database_url, args.students, args.careers,
+        courses_per_career=args.courses_per_career,
+        scholarships=args.scholarships,
+        recommendations_per_student=args.recommendations_per_student,
+        days=args.days, until=args.until, seed=args.seed, chunk_size=args.chunk_size
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
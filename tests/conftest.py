@@ -0,0 +1,28 @@
+import os
+import shutil
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py reads DATABASE_URL at import time, so point it at a throwaway database first
+_database_dir = tempfile.mkdtemp(prefix='education-assessment-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_database_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The Flask app on a freshly migrated and seeded database"""
+    from app import app as flask_app, init_db_and_data  # Deferred import
+    if not os.path.isdir(os.path.join(ROOT, flask_app.template_folder)):
+        # Checkouts that keep the templates next to the modules
+        flask_app.template_folder = ROOT
+    flask_app.config['TESTING'] = True
+    init_db_and_data()
+    return flask_app
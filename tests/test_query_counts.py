@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import func, select
+from app import db
+from db_maintenance import QUERY_BUDGETS, count_route_queries
+from models import Career, Student
+from profiles import ASSESSMENT_FIELDS
+
+
+@pytest.fixture(scope='module')
+def query_counts(app):
+    """Statements issued by each budgeted route for a fresh student, caches warm"""
+    with app.app_context():
+        student = Student(name='Query Budget', age=17, location='Nagpur', education_level='12th_grade',
+                          **{field: 3.0 for field in ASSESSMENT_FIELDS})
+        db.session.add(student)
+        db.session.commit()
+        career_id = db.session.scalar(select(func.min(Career.id)))
+        return count_route_queries(student.id, career_id)
+
+
+@pytest.mark.parametrize('route', sorted(QUERY_BUDGETS))
+def test_route_stays_within_query_budget(query_counts, route):
+    assert query_counts[route] <= QUERY_BUDGETS[route], (
+        f"{route} issued {query_counts[route]} queries, budget is {QUERY_BUDGETS[route]}"
+    )
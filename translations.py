@@ -1,134 +1,282 @@
+from types import MappingProxyType
+
+DEFAULT_LANGUAGE = 'en'
+
+# Source catalogs; languages may leave keys out and fall back to English
+_CATALOGS = {
+    'en': {
+        'app_title': 'Career Guidance for Rural Students',
+        'tagline': 'Discover your perfect career path with AI-powered recommendations',
+        'start_assessment': 'Start Career Assessment',
+        'about_heading': 'About This Platform',
+        'about_text': 'Our AI-powered career guidance platform helps rural students discover suitable career paths based on their skills, interests, and personality traits. Get personalized recommendations with course suggestions and scholarship information.',
+        'features_heading': 'Key Features',
+        'feature_1': 'AI-powered career matching',
+        'feature_2': 'Free online course recommendations',
+        'feature_3': 'Scholarship and funding information',
+        'feature_4': 'Regional language support',
+        'feature_5': 'Mobile-friendly interface',
+        'feature_6': 'Rural-focused career options',
+        'assessment_title': 'Career Assessment',
+        'basic_info': 'Basic Information',
+        'skills_assessment': 'Skills Assessment',
+        'interests_assessment': 'Interest Assessment',
+        'personality_assessment': 'Personality Assessment',
+        'submit_assessment': 'Get My Career Recommendations',
+        'results_title': 'Your Career Recommendations',
+        'match_score': 'Match Score',
+        'view_details': 'View Details',
+        'recommended_courses': 'Recommended Courses',
+        'scholarships': 'Available Scholarships',
+        'career_details': 'Career Details',
+        'why_recommended': 'Why This Career is Recommended for You',
+        'salary_range': 'Salary Range',
+        'job_growth': 'Job Growth',
+        'education_required': 'Education Required',
+        'rural_opportunities': 'Rural Opportunities Available',
+        'related_courses': 'Related Courses',
+        'back_to_results': 'Back to Results',
+        'course_duration': 'Duration',
+        'course_level': 'Level',
+        'free_course': 'Free',
+        'paid_course': 'Paid',
+        'scholarship_amount': 'Amount',
+        'eligibility': 'Eligibility',
+        'deadline': 'Deadline',
+        'apply_now': 'Apply Now',
+        'language_selector': 'Select Language'
+    },
+    'hi': {
+        'app_title': 'ग्रामीण छात्रों के लिए करियर गाइडेंस',
+        'tagline': 'AI-आधारित सुझावों के साथ अपना सही करियर पथ खोजें',
+        'start_assessment': 'करियर असेसमेंट शुरू करें',
+        'about_heading': 'इस प्लेटफॉर्म के बारे में',
+        'about_text': 'हमारा AI-आधारित करियर गाइडेंस प्लेटफॉर्म ग्रामीण छात्रों को उनके कौशल, रुचियों और व्यक्तित्व के आधार पर उपयुक्त करियर पथ खोजने में मदद करता है।',
+        'features_heading': 'मुख्य विशेषताएं',
+        'feature_1': 'AI-आधारित करियर मैचिंग',
+        'feature_2': 'मुफ्त ऑनलाइन कोर्स सुझाव',
+        'feature_3': 'छात्रवृत्ति और फंडिंग जानकारी',
+        'feature_4': 'क्षेत्रीय भाषा समर्थन',
+        'feature_5': 'मोबाइल-फ्रेंडली इंटरफेस',
+        'feature_6': 'ग्रामीण-केंद्रित करियर विकल्प',
+        'assessment_title': 'करियर असेसमेंट',
+        'basic_info': 'बुनियादी जानकारी',
+        'skills_assessment': 'कौशल मूल्यांकन',
+        'interests_assessment': 'रुचि मूल्यांकन',
+        'personality_assessment': 'व्यक्तित्व मूल्यांकन',
+        'submit_assessment': 'मेरी करियर सिफारिशें पाएं',
+        'results_title': 'आपकी करियर सिफारिशें',
+        'match_score': 'मैच स्कोर',
+        'view_details': 'विवरण देखें',
+        'recommended_courses': 'सुझाए गए कोर्स',
+        'scholarships': 'उपलब्ध छात्रवृत्तियां',
+        'career_details': 'करियर विवरण',
+        'why_recommended': 'यह करियर आपके लिए क्यों सुझाया गया है',
+        'salary_range': 'वेतन सीमा',
+        'job_growth': 'नौकरी की वृद्धि',
+        'education_required': 'आवश्यक शिक्षा',
+        'rural_opportunities': 'ग्रामीण अवसर उपलब्ध',
+        'related_courses': 'संबंधित कोर्स',
+        'back_to_results': 'परिणामों पर वापस जाएं',
+        'course_duration': 'अवधि',
+        'course_level': 'स्तर',
+        'free_course': 'मुफ्त',
+        'paid_course': 'भुगतान',
+        'scholarship_amount': 'राशि',
+        'eligibility': 'पात्रता',
+        'deadline': 'अंतिम तिथि',
+        'apply_now': 'अभी आवेदन करें',
+        'language_selector': 'भाषा चुनें'
+    },
+    'te': {
+        'app_title': 'గ్రామీణ విద్యార్థుల కోసం కెరీర్ మార్గదర్శనం',
+        'tagline': 'AI-ఆధారిత సూచనలతో మీ సరైన కెరీర్ మార్గాన్ని కనుగొనండి',
+        'start_assessment': 'కెరీర్ అంచనా ప్రారంభించండి',
+        'about_heading': 'ఈ ప్లాట్‌ఫామ్ గురించి',
+        'about_text': 'మా AI-ఆధారిత కెరీర్ మార్గదర్శన ప్లాట్‌ఫామ్ గ్రామీణ విద్యార్థులు వారి నైపుణ్యాలు, అభిరుచులు మరియు వ్యక్తిత్వ లక్షణాల ఆధారంగా తగిన కెరీర్ మార్గాలను కనుగొనడంలో సహాయపడుతుంది।',
+        'features_heading': 'ముఖ్య లక్షణాలు',
+        'feature_1': 'AI-ఆధారిత కెరీర్ మ్యాచింగ్',
+        'feature_2': 'ఉచిత ఆన్‌లైన్ కోర్స్ సూచనలు',
+        'feature_3': 'స్కాలర్‌షిప్ మరియు ఫండింగ్ సమాచారం',
+        'feature_4': 'ప్రాంతీయ భాషా మద్దతు',
+        'feature_5': 'మొబైల్-స్నేహపూర్వక ఇంటర్‌ఫేస్',
+        'feature_6': 'గ్రామీణ-కేంద్రిత కెరీర్ ఎంపికలు',
+        'assessment_title': 'కెరీర్ అంచనా',
+        'basic_info': 'ప్రాథమిక సమాచారం',
+        'skills_assessment': 'నైపుణ్యాల అంచనా',
+        'interests_assessment': 'అభిరుచుల అంచనా',
+        'personality_assessment': 'వ్యక్తిత్వ అంచనా',
+        'submit_assessment': 'నా కెరీర్ సూచనలు పొందండి',
+        'results_title': 'మీ కెరీర్ సూచనలు',
+        'match_score': 'మ్యాచ్ స్కోర్',
+        'view_details': 'వివరాలు చూడండి',
+        'recommended_courses': 'సూచించిన కోర్సులు',
+        'scholarships': 'అందుబాటులో ఉన్న స్కాలర్‌షిప్‌లు',
+        'career_details': 'కెరీర్ వివరాలు',
+        'why_recommended': 'ఈ కెరీర్ మీకు ఎందుకు సూచించబడింది',
+        'salary_range': 'జీతం పరిధి',
+        'job_growth': 'ఉద్యోగ వృద్ధి',
+        'education_required': 'అవసరమైన విద్య',
+        'rural_opportunities': 'గ్రామీణ అవకాశాలు అందుబాటులో',
+        'related_courses': 'సంబంధిత కోర్సులు',
+        'back_to_results': 'ఫలితాలకు తిరిగి వెళ్లండి',
+        'course_duration': 'వ్యవధి',
+        'course_level': 'స్థాయి',
+        'free_course': 'ఉచితం',
+        'paid_course': 'చెల్లింపు',
+        'scholarship_amount': 'మొత్తం',
+        'eligibility': 'అర్హత',
+        'deadline': 'గడువు',
+        'apply_now': 'ఇప్పుడే దరఖాస్తు చేయండి',
+        'language_selector': 'భాషను ఎంచుకోండి'
+    },
+    'ta': {
+        'app_title': 'கிராமப்புற மாணவர்களுக்கான தொழில் வழிகாட்டுதல்',
+        'tagline': 'AI அடிப்படையிலான பரிந்துரைகளுடன் உங்களுக்கு ஏற்ற தொழில் பாதையைக் கண்டறியுங்கள்',
+        'start_assessment': 'தொழில் மதிப்பீட்டைத் தொடங்குங்கள்',
+        'about_heading': 'இந்த தளத்தைப் பற்றி',
+        'about_text': 'எங்கள் AI அடிப்படையிலான தொழில் வழிகாட்டுதல் தளம் கிராமப்புற மாணவர்கள் தங்கள் திறன்கள், ஆர்வங்கள் மற்றும் ஆளுமையின் அடிப்படையில் பொருத்தமான தொழில் பாதைகளைக் கண்டறிய உதவுகிறது.',
+        'features_heading': 'முக்கிய அம்சங்கள்',
+        'feature_1': 'AI அடிப்படையிலான தொழில் பொருத்தம்',
+        'feature_2': 'இலவச ஆன்லைன் பாடநெறி பரிந்துரைகள்',
+        'feature_3': 'உதவித்தொகை மற்றும் நிதி தகவல்',
+        'feature_4': 'பிராந்திய மொழி ஆதரவு',
+        'feature_5': 'மொபைலுக்கு ஏற்ற இடைமுகம்',
+        'feature_6': 'கிராமப்புறத்தை மையமாகக் கொண்ட தொழில் வாய்ப்புகள்',
+        'assessment_title': 'தொழில் மதிப்பீடு',
+        'basic_info': 'அடிப்படைத் தகவல்',
+        'skills_assessment': 'திறன் மதிப்பீடு',
+        'interests_assessment': 'ஆர்வ மதிப்பீடு',
+        'personality_assessment': 'ஆளுமை மதிப்பீடு',
+        'submit_assessment': 'எனது தொழில் பரிந்துரைகளைப் பெறுங்கள்',
+        'results_title': 'உங்கள் தொழில் பரிந்துரைகள்',
+        'match_score': 'பொருத்த மதிப்பெண்',
+        'view_details': 'விவரங்களைக் காண்க',
+        'recommended_courses': 'பரிந்துரைக்கப்பட்ட பாடநெறிகள்',
+        'scholarships': 'கிடைக்கும் உதவித்தொகைகள்',
+        'career_details': 'தொழில் விவரங்கள்',
+        'why_recommended': 'இந்தத் தொழில் உங்களுக்கு ஏன் பரிந்துரைக்கப்படுகிறது',
+        'salary_range': 'சம்பள வரம்பு',
+        'job_growth': 'வேலை வளர்ச்சி',
+        'education_required': 'தேவையான கல்வி',
+        'rural_opportunities': 'கிராமப்புற வாய்ப்புகள் உள்ளன',
+        'related_courses': 'தொடர்புடைய பாடநெறிகள்',
+        'back_to_results': 'முடிவுகளுக்குத் திரும்பு',
+        'course_duration': 'கால அளவு',
+        'course_level': 'நிலை',
+        'free_course': 'இலவசம்',
+        'paid_course': 'கட்டணம்',
+        'scholarship_amount': 'தொகை',
+        'eligibility': 'தகுதி',
+        'deadline': 'கடைசி தேதி',
+        'apply_now': 'இப்போதே விண்ணப்பிக்கவும்',
+        'language_selector': 'மொழியைத் தேர்ந்தெடுக்கவும்'
+    },
+    'bn': {
+        'app_title': 'গ্রামীণ শিক্ষার্থীদের জন্য ক্যারিয়ার নির্দেশিকা',
+        'tagline': 'AI-ভিত্তিক পরামর্শের মাধ্যমে আপনার সঠিক ক্যারিয়ার পথ খুঁজুন',
+        'start_assessment': 'ক্যারিয়ার মূল্যায়ন শুরু করুন',
+        'about_heading': 'এই প্ল্যাটফর্ম সম্পর্কে',
+        'about_text': 'আমাদের AI-ভিত্তিক ক্যারিয়ার নির্দেশিকা প্ল্যাটফর্ম গ্রামীণ শিক্ষার্থীদের তাদের দক্ষতা, আগ্রহ এবং ব্যক্তিত্বের ভিত্তিতে উপযুক্ত ক্যারিয়ার পথ খুঁজে পেতে সাহায্য করে।',
+        'features_heading': 'প্রধান বৈশিষ্ট্য',
+        'feature_1': 'AI-ভিত্তিক ক্যারিয়ার মিলকরণ',
+        'feature_2': 'বিনামূল্যে অনলাইন কোর্সের পরামর্শ',
+        'feature_3': 'বৃত্তি ও আর্থিক সহায়তার তথ্য',
+        'feature_4': 'আঞ্চলিক ভাষা সমর্থন',
+        'feature_5': 'মোবাইল-বান্ধব ইন্টারফেস',
+        'feature_6': 'গ্রামীণ-কেন্দ্রিক ক্যারিয়ার বিকল্প',
+        'assessment_title': 'ক্যারিয়ার মূল্যায়ন',
+        'basic_info': 'প্রাথমিক তথ্য',
+        'skills_assessment': 'দক্ষতা মূল্যায়ন',
+        'interests_assessment': 'আগ্রহ মূল্যায়ন',
+        'personality_assessment': 'ব্যক্তিত্ব মূল্যায়ন',
+        'submit_assessment': 'আমার ক্যারিয়ার পরামর্শ পান',
+        'results_title': 'আপনার ক্যারিয়ার পরামর্শ',
+        'match_score': 'মিলের স্কোর',
+        'view_details': 'বিস্তারিত দেখুন',
+        'recommended_courses': 'প্রস্তাবিত কোর্স',
+        'scholarships': 'উপলব্ধ বৃত্তি',
+        'career_details': 'ক্যারিয়ারের বিবরণ',
+        'why_recommended': 'কেন এই ক্যারিয়ারটি আপনার জন্য প্রস্তাবিত',
+        'salary_range': 'বেতনের পরিসর',
+        'job_growth': 'চাকরির বৃদ্ধি',
+        'education_required': 'প্রয়োজনীয় শিক্ষা',
+        'rural_opportunities': 'গ্রামীণ সুযোগ উপলব্ধ',
+        'related_courses': 'সম্পর্কিত কোর্স',
+        'back_to_results': 'ফলাফলে ফিরে যান',
+        'course_duration': 'সময়কাল',
+        'course_level': 'স্তর',
+        'free_course': 'বিনামূল্যে',
+        'paid_course': 'সশুল্ক',
+        'scholarship_amount': 'পরিমাণ',
+        'eligibility': 'যোগ্যতা',
+        'deadline': 'শেষ তারিখ',
+        'apply_now': 'এখনই আবেদন করুন',
+        'language_selector': 'ভাষা নির্বাচন করুন'
+    },
+    'mr': {
+        'app_title': 'ग्रामीण विद्यार्थ्यांसाठी करिअर मार्गदर्शन',
+        'tagline': 'AI-आधारित शिफारसींसह तुमचा योग्य करिअर मार्ग शोधा',
+        'start_assessment': 'करिअर मूल्यांकन सुरू करा',
+        'about_heading': 'या प्लॅटफॉर्मबद्दल',
+        'about_text': 'आमचा AI-आधारित करिअर मार्गदर्शन प्लॅटफॉर्म ग्रामीण विद्यार्थ्यांना त्यांची कौशल्ये, आवडी आणि व्यक्तिमत्त्वाच्या आधारे योग्य करिअर मार्ग शोधण्यास मदत करतो.',
+        'features_heading': 'मुख्य वैशिष्ट्ये',
+        'feature_1': 'AI-आधारित करिअर जुळवणी',
+        'feature_2': 'मोफत ऑनलाइन कोर्स सूचना',
+        'feature_3': 'शिष्यवृत्ती आणि निधी माहिती',
+        'feature_4': 'प्रादेशिक भाषा समर्थन',
+        'feature_5': 'मोबाइल-अनुकूल इंटरफेस',
+        'feature_6': 'ग्रामीण-केंद्रित करिअर पर्याय',
+        'assessment_title': 'करिअर मूल्यांकन',
+        'basic_info': 'मूलभूत माहिती',
+        'skills_assessment': 'कौशल्य मूल्यांकन',
+        'interests_assessment': 'आवड मूल्यांकन',
+        'personality_assessment': 'व्यक्तिमत्त्व मूल्यांकन',
+        'submit_assessment': 'माझ्या करिअर शिफारसी मिळवा',
+        'results_title': 'तुमच्या करिअर शिफारसी',
+        'match_score': 'जुळणी गुण',
+        'view_details': 'तपशील पहा',
+        'recommended_courses': 'शिफारस केलेले कोर्स',
+        'scholarships': 'उपलब्ध शिष्यवृत्ती',
+        'career_details': 'करिअर तपशील',
+        'why_recommended': 'हे करिअर तुमच्यासाठी का सुचवले आहे',
+        'salary_range': 'पगार श्रेणी',
+        'job_growth': 'नोकरीतील वाढ',
+        'education_required': 'आवश्यक शिक्षण',
+        'rural_opportunities': 'ग्रामीण संधी उपलब्ध',
+        'related_courses': 'संबंधित कोर्स',
+        'back_to_results': 'निकालांकडे परत जा',
+        'course_duration': 'कालावधी',
+        'course_level': 'स्तर',
+        'free_course': 'मोफत',
+        'paid_course': 'सशुल्क',
+        'scholarship_amount': 'रक्कम',
+        'eligibility': 'पात्रता',
+        'deadline': 'अंतिम तारीख',
+        'apply_now': 'आता अर्ज करा',
+        'language_selector': 'भाषा निवडा'
+    }
+}
+
+
+def _compile_catalogs(catalogs):
+    """
+    Merge every language over the English catalog and freeze the result,
+    so lookups are plain dict reads and missing keys fall back to English
+    """
+    fallback = catalogs[DEFAULT_LANGUAGE]
+    return MappingProxyType({
+        language: MappingProxyType({**fallback, **catalog})
+        for language, catalog in catalogs.items()
+    })
+
+
+# Built once at import time and shared by every request
+TRANSLATIONS = _compile_catalogs(_CATALOGS)
+
+
 def get_translations(language='en'):
     """
     Get translations for the specified language
     """
-    translations = {
-        'en': {
-            'app_title': 'Career Guidance for Rural Students',
-            'tagline': 'Discover your perfect career path with AI-powered recommendations',
-            'start_assessment': 'Start Career Assessment',
-            'about_heading': 'About This Platform',
-            'about_text': 'Our AI-powered career guidance platform helps rural students discover suitable career paths based on their skills, interests, and personality traits. Get personalized recommendations with course suggestions and scholarship information.',
-            'features_heading': 'Key Features',
-            'feature_1': 'AI-powered career matching',
-            'feature_2': 'Free online course recommendations',
-            'feature_3': 'Scholarship and funding information',
-            'feature_4': 'Regional language support',
-            'feature_5': 'Mobile-friendly interface',
-            'feature_6': 'Rural-focused career options',
-            'assessment_title': 'Career Assessment',
-            'basic_info': 'Basic Information',
-            'skills_assessment': 'Skills Assessment',
-            'interests_assessment': 'Interest Assessment',
-            'personality_assessment': 'Personality Assessment',
-            'submit_assessment': 'Get My Career Recommendations',
-            'results_title': 'Your Career Recommendations',
-            'match_score': 'Match Score',
-            'view_details': 'View Details',
-            'recommended_courses': 'Recommended Courses',
-            'scholarships': 'Available Scholarships',
-            'career_details': 'Career Details',
-            'why_recommended': 'Why This Career is Recommended for You',
-            'salary_range': 'Salary Range',
-            'job_growth': 'Job Growth',
-            'education_required': 'Education Required',
-            'rural_opportunities': 'Rural Opportunities Available',
-            'related_courses': 'Related Courses',
-            'back_to_results': 'Back to Results',
-            'course_duration': 'Duration',
-            'course_level': 'Level',
-            'free_course': 'Free',
-            'paid_course': 'Paid',
-            'scholarship_amount': 'Amount',
-            'eligibility': 'Eligibility',
-            'deadline': 'Deadline',
-            'apply_now': 'Apply Now',
-            'language_selector': 'Select Language'
-        },
-        'hi': {
-            'app_title': 'ग्रामीण छात्रों के लिए करियर गाइडेंस',
-            'tagline': 'AI-आधारित सुझावों के साथ अपना सही करियर पथ खोजें',
-            'start_assessment': 'करियर असेसमेंट शुरू करें',
-            'about_heading': 'इस प्लेटफॉर्म के बारे में',
-            'about_text': 'हमारा AI-आधारित करियर गाइडेंस प्लेटफॉर्म ग्रामीण छात्रों को उनके कौशल, रुचियों और व्यक्तित्व के आधार पर उपयुक्त करियर पथ खोजने में मदद करता है।',
-            'features_heading': 'मुख्य विशेषताएं',
-            'feature_1': 'AI-आधारित करियर मैचिंग',
-            'feature_2': 'मुफ्त ऑनलाइन कोर्स सुझाव',
-            'feature_3': 'छात्रवृत्ति और फंडिंग जानकारी',
-            'feature_4': 'क्षेत्रीय भाषा समर्थन',
-            'feature_5': 'मोबाइल-फ्रेंडली इंटरफेस',
-            'feature_6': 'ग्रामीण-केंद्रित करियर विकल्प',
-            'assessment_title': 'करियर असेसमेंट',
-            'basic_info': 'बुनियादी जानकारी',
-            'skills_assessment': 'कौशल मूल्यांकन',
-            'interests_assessment': 'रुचि मूल्यांकन',
-            'personality_assessment': 'व्यक्तित्व मूल्यांकन',
-            'submit_assessment': 'मेरी करियर सिफारिशें पाएं',
-            'results_title': 'आपकी करियर सिफारिशें',
-            'match_score': 'मैच स्कोर',
-            'view_details': 'विवरण देखें',
-            'recommended_courses': 'सुझाए गए कोर्स',
-            'scholarships': 'उपलब्ध छात्रवृत्तियां',
-            'career_details': 'करियर विवरण',
-            'why_recommended': 'यह करियर आपके लिए क्यों सुझाया गया है',
-            'salary_range': 'वेतन सीमा',
-            'job_growth': 'नौकरी की वृद्धि',
-            'education_required': 'आवश्यक शिक्षा',
-            'rural_opportunities': 'ग्रामीण अवसर उपलब्ध',
-            'related_courses': 'संबंधित कोर्स',
-            'back_to_results': 'परिणामों पर वापस जाएं',
-            'course_duration': 'अवधि',
-            'course_level': 'स्तर',
-            'free_course': 'मुफ्त',
-            'paid_course': 'भुगतान',
-            'scholarship_amount': 'राशि',
-            'eligibility': 'पात्रता',
-            'deadline': 'अंतिम तिथि',
-            'apply_now': 'अभी आवेदन करें',
-            'language_selector': 'भाषा चुनें'
-        },
-        'te': {
-            'app_title': 'గ్రామీణ విద్యార్థుల కోసం కెరీర్ మార్గదర్శనం',
-            'tagline': 'AI-ఆధారిత సూచనలతో మీ సరైన కెరీర్ మార్గాన్ని కనుగొనండి',
-            'start_assessment': 'కెరీర్ అంచనా ప్రారంభించండి',
-            'about_heading': 'ఈ ప్లాట్‌ఫామ్ గురించి',
-            'about_text': 'మా AI-ఆధారిత కెరీర్ మార్గదర్శన ప్లాట్‌ఫామ్ గ్రామీణ విద్యార్థులు వారి నైపుణ్యాలు, అభిరుచులు మరియు వ్యక్తిత్వ లక్షణాల ఆధారంగా తగిన కెరీర్ మార్గాలను కనుగొనడంలో సహాయపడుతుంది।',
-            'features_heading': 'ముఖ్య లక్షణాలు',
-            'feature_1': 'AI-ఆధారిత కెరీర్ మ్యాచింగ్',
-            'feature_2': 'ఉచిత ఆన్‌లైన్ కోర్స్ సూచనలు',
-            'feature_3': 'స్కాలర్‌షిప్ మరియు ఫండింగ్ సమాచారం',
-            'feature_4': 'ప్రాంతీయ భాషా మద్దతు',
-            'feature_5': 'మొబైల్-స్నేహపూర్వక ఇంటర్‌ఫేస్',
-            'feature_6': 'గ్రామీణ-కేంద్రిత కెరీర్ ఎంపికలు',
-            'assessment_title': 'కెరీర్ అంచనా',
-            'basic_info': 'ప్రాథమిక సమాచారం',
-            'skills_assessment': 'నైపుణ్యాల అంచనా',
-            'interests_assessment': 'అభిరుచుల అంచనా',
-            'personality_assessment': 'వ్యక్తిత్వ అంచనా',
-            'submit_assessment': 'నా కెరీర్ సూచనలు పొందండి',
-            'results_title': 'మీ కెరీర్ సూచనలు',
-            'match_score': 'మ్యాచ్ స్కోర్',
-            'view_details': 'వివరాలు చూడండి',
-            'recommended_courses': 'సూచించిన కోర్సులు',
-            'scholarships': 'అందుబాటులో ఉన్న స్కాలర్‌షిప్‌లు',
-            'career_details': 'కెరీర్ వివరాలు',
-            'why_recommended': 'ఈ కెరీర్ మీకు ఎందుకు సూచించబడింది',
-            'salary_range': 'జీతం పరిధి',
-            'job_growth': 'ఉద్యోగ వృద్ధి',
-            'education_required': 'అవసరమైన విద్య',
-            'rural_opportunities': 'గ్రామీణ అవకాశాలు అందుబాటులో',
-            'related_courses': 'సంబంధిత కోర్సులు',
-            'back_to_results': 'ఫలితాలకు తిరిగి వెళ్లండి',
-            'course_duration': 'వ్యవధి',
-            'course_level': 'స్థాయి',
-            'free_course': 'ఉచితం',
-            'paid_course': 'చెల్లింపు',
-            'scholarship_amount': 'మొత్తం',
-            'eligibility': 'అర్హత',
-            'deadline': 'గడువు',
-            'apply_now': 'ఇప్పుడే దరఖాస్తు చేయండి',
-            'language_selector': 'భాషను ఎంచుకోండి'
-        }
-    }
-    
-    return translations.get(language, translations['en'])
\ No newline at end of file
+    return TRANSLATIONS.get(language, TRANSLATIONS[DEFAULT_LANGUAGE])
@@ -0,0 +1,201 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _PendingWrite:
+    __slots__ = ('model', 'values', 'future')
+
+    def __init__(self, model, values, future):
+        self.model = model
+        self.values = values
+        self.future = future
+
+
+class WriteBehindQueue:
+    """
+    Optional write-behind queue for inserts on hot request paths.
+    A background thread groups queued rows into one transaction per batch,
+    so concurrent submissions share a commit instead of each taking the
+    SQLite write lock. When the queue is full the caller writes its row
+    synchronously, so nothing is dropped. Rows that still fail when retried
+    one by one are reported to a waiting caller, or else appended to
+    WRITE_BEHIND_FAILED_FILE as JSON lines for replay.
+    """
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 500
+        self.flush_interval = 0.05
+        self.failed_file = None
+        self._queue = None
+        self._thread = None
+        self._statements = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config['WRITE_BEHIND_ENABLED']
+        self.batch_size = app.config['WRITE_BEHIND_BATCH_SIZE']
+        self.flush_interval = app.config['WRITE_BEHIND_FLUSH_INTERVAL']
+        self.failed_file = app.config['WRITE_BEHIND_FAILED_FILE']
+        self._queue = queue.Queue(maxsize=app.config['WRITE_BEHIND_MAX_DEPTH'])
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def register_statement(self, model, factory):
+        """
+        Use factory() instead of a plain INSERT when flushing rows of model,
+        e.g. to upsert. Called inside an app context at flush time.
+        """
+        self._statements[model] = factory
+
+    def submit(self, model, values, wait=False, timeout=10):
+        """
+        Queue one row for insertion. With wait=True, block until its batch
+        is committed and return the new primary key. A row not yet taken for
+        writing when the timeout expires is cancelled, so a TimeoutError means
+        it was never written; one already being written is waited for.
+        """
+        pending = _PendingWrite(model, values, Future() if wait else None)
+        if not self.enabled:
+            self._write([pending])
+        else:
+            try:
+                self._queue.put_nowait(pending)
+            except queue.Full:
+                logger.warning(f"Write-behind queue full, writing {model.__name__} row synchronously")
+                self._write([pending])
+        if wait:
+            try:
+                return pending.future.result(timeout=timeout)
+            except FutureTimeoutError:
+                if pending.future.cancel():
+                    raise
+                return pending.future.result()
+        return None
+
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stop(self, timeout=30):
+        """
+        Flush everything still queued and stop the background thread
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Write-behind queue flushed and stopped")
+
+    def _run(self):
+        while True:
+            pending = self._queue.get()
+            if pending is _STOP:
+                break
+            batch = [pending]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    pending = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stopping = True
+                    break
+                batch.append(pending)
+            self._write(batch)
+            if stopping:
+                break
+
+        # Drain anything submitted while stopping
+        remaining = []
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is not _STOP:
+                remaining.append(pending)
+        if remaining:
+            self._write(remaining)
+
+    def _write(self, batch):
+        # Skip rows whose caller gave up waiting; the others can no longer be cancelled
+        batch = [pending for pending in batch
+                 if pending.future is None or pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            self._commit(batch)
+        except Exception as e:
+            logger.error(f"Write-behind batch of {len(batch)} rows failed, retrying row by row: {str(e)}")
+            for pending in batch:
+                try:
+                    self._commit([pending])
+                except Exception as row_error:
+                    if pending.future is not None:
+                        pending.future.set_exception(row_error)
+                    else:
+                        self._record_failure(pending, row_error)
+
+    def _record_failure(self, pending, error):
+        """
+        Append a row nobody waits for to the failed-rows file, so it is not lost
+        """
+        logger.error(f"Could not write {pending.model.__name__} row {pending.values}: {str(error)}")
+        if not self.failed_file:
+            return
+        record = {
+            'model': pending.model.__name__,
+            'values': pending.values,
+            'error': str(error),
+            'failed_at': datetime.utcnow().isoformat(),
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.failed_file)), exist_ok=True)
+            with open(self.failed_file, 'a') as f:
+                f.write(json.dumps(record, default=str) + '\n')
+        except OSError as e:
+            logger.error(f"Could not record failed {pending.model.__name__} row: {str(e)}")
+
+    def _commit(self, batch):
+        # A fresh app context gets its own scoped session, separate from any request's
+        with self.app.app_context():
+            try:
+                # Rows whose caller waits for an id go through the ORM to get primary keys back
+                keyed = [(pending, pending.model(**pending.values)) for pending in batch if pending.future is not None]
+                db.session.add_all([obj for _, obj in keyed])
+
+                grouped = {}
+                for pending in batch:
+                    if pending.future is None:
+                        grouped.setdefault(pending.model, []).append(pending.values)
+                for model, rows in grouped.items():
+                    factory = self._statements.get(model)
+                    db.session.execute(factory() if factory else insert(model), rows)
+
+                db.session.commit()
+                for pending, obj in keyed:
+                    pending.future.set_result(obj.id)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+
+write_queue = WriteBehindQueue()